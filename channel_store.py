@@ -0,0 +1,97 @@
+import numpy as np
+
+from track_lines import ChannelRow
+
+# Columnar state of the receiver channels.
+#
+# One record per pocket_trk channel number, so an update is a single
+# indexed write and consumers filter whole columns at once instead of
+# walking a dict of tuples. Every record remembers the epoch it was last
+# reported in; channels that stop being printed (lost lock) expire.
+# Only complete redraws (those that start with a status line) advance the
+# epoch counter; a partial one, e.g. the tail of a redraw seen after a
+# reconnect, updates its channels but must not age out the others.
+
+CHANNEL_DTYPE = np.dtype([
+    ('ch', np.int32),
+    ('sat', 'U4'),
+    ('sig', 'U5'),
+    ('prn', np.int32),
+    ('lock', np.float64),
+    ('cn0', np.float64),
+    ('coff', np.float64),
+    ('dop', np.float64),
+    ('nav', np.int32),
+    ('lol', np.int32),
+    ('fec', np.int32),
+    ('last_seen', np.int64),
+    ('active', np.bool_),
+])
+
+# Signal name -> constellation, as used by the C/N0 plot
+CONSTELLATIONS = {
+    "GPS": ("L1CA",),
+    "Galileo": ("E1B", "E5AI", "E5BI"),
+    "BeiDou": ("B1I", "B1CD", "B2AD", "B2I", "B2BI", "B3I"),
+    "GLONASS": ("G1CA",),
+}
+
+
+class ChannelStore:
+    def __init__(self, capacity=128, max_age=2):
+        self.max_age = max_age
+        self.epoch = 0
+        self.data = np.zeros(capacity, dtype=CHANNEL_DTYPE)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.data['active']))
+
+    def _ensure(self, ch):
+        if ch >= len(self.data):
+            size = len(self.data)
+            while size <= ch:
+                size *= 2
+            grown = np.zeros(size, dtype=CHANNEL_DTYPE)
+            grown[:len(self.data)] = self.data
+            self.data = grown
+
+    def update(self, row):
+        ch = row.ch
+        if ch < 0:
+            return
+        self._ensure(ch)
+        self.data[ch] = tuple(row) + (self.epoch, True)
+
+    def apply_epoch(self, rows, complete=True):
+        """Store one redraw of the channel table; a complete one also expires channels that were not in it."""
+        if complete:
+            self.epoch += 1
+        for row in rows:
+            self.update(row)
+        if complete:
+            self.expire()
+        return self.epoch
+
+    def expire(self):
+        data = self.data
+        stale = data['active'] & (data['last_seen'] < self.epoch - self.max_age + 1)
+        if stale.any():
+            data['active'][stale] = False
+
+    def clear(self):
+        self.data = np.zeros(len(self.data), dtype=CHANNEL_DTYPE)
+        self.epoch = 0
+
+    def select(self, sigs=None, system=None):
+        """Active records (ordered by channel), optionally limited to signals or a constellation."""
+        mask = self.data['active']
+        if system is not None:
+            sigs = CONSTELLATIONS[system]
+        if sigs is not None:
+            mask = mask & np.isin(self.data['sig'], sigs)
+        return self.data[mask]
+
+    def rows(self):
+        """Active channels as ChannelRow, ordered by channel number."""
+        records = self.data[self.data['active']]
+        return [ChannelRow(*rec[:11]) for rec in records.tolist()]
@@ -0,0 +1,105 @@
+import math
+
+import numpy as np
+from matplotlib.patches import Patch, Rectangle
+
+from channel_store import CONSTELLATIONS
+
+# Persistent, blitted C/N0 bar chart.
+#
+# update_plot used to ax.clear() and rebuild every bar, the title, labels,
+# grid and legend, followed by a full canvas.draw() for each batch of
+# channel lines. CN0Chart keeps one animated Rectangle per channel slot.
+# Only when the set of tracked channels changes (or C/N0 outgrows the y
+# range) are the x ticks laid out again and the figure fully redrawn;
+# otherwise the bar heights are updated in place and blitted over a cached
+# background.
+
+COLORS = {
+    "GPS": "skyblue",
+    "Galileo": "green",
+    "BeiDou": "orange",
+    "GLONASS": "red"
+}
+
+_SIG_GROUP = {sig: i for i, sigs in enumerate(CONSTELLATIONS.values()) for sig in sigs}
+_SIG_COLOR = {sig: COLORS[name] for name, sigs in CONSTELLATIONS.items() for sig in sigs}
+
+
+class CN0Chart:
+    def __init__(self, ax, canvas, bar_width=0.8, ymax=60):
+        self.ax = ax
+        self.canvas = canvas
+        self.bar_width = bar_width
+        self.bars = []
+        self.keys = None
+        self._background = None
+
+        ax.set_title("Carrier-to-Noise Ratio per Satellite", fontsize=14, color="black")
+        ax.set_xlabel("Satellite", fontsize=9, color="black")
+        ax.set_ylabel("C/N0 (dB-Hz)", fontsize=9, color="black")
+        ax.grid(True)
+        ax.set_ylim(0, ymax)
+        ax.legend(handles=[Patch(color=color, label=name) for name, color in COLORS.items()], loc="upper right")
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        # Full redraws (layout change, resize) refresh the cached background
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_bars()
+
+    def _draw_bars(self):
+        for bar in self.bars:
+            self.ax.draw_artist(bar)
+
+    def _layout(self, keys):
+        while len(self.bars) < len(keys):
+            bar = Rectangle((0, 0), self.bar_width, 0, animated=True)
+            self.ax.add_patch(bar)
+            self.bars.append(bar)
+        while len(self.bars) > len(keys):
+            self.bars.pop().remove()
+
+        sats = [sat for _, sat, _ in keys]
+        labels = []
+        for i, (bar, (_, sat, sig)) in enumerate(zip(self.bars, keys)):
+            bar.set_x(i - self.bar_width / 2)
+            bar.set_facecolor(_SIG_COLOR[sig])
+            # Same satellite on several signals: tell the bars apart
+            labels.append(f"{sat}\n{sig}" if sats.count(sat) > 1 else sat)
+        self.ax.set_xticks(range(len(keys)))
+        self.ax.set_xticklabels(labels)
+        self.ax.set_xlim(-0.5, max(len(keys), 1) - 0.5)
+        self.keys = keys
+
+    def update(self, records):
+        """Show the C/N0 of channel store records. Always draws; returns True for the render scheduler."""
+        records = records[np.isin(records['sig'], list(_SIG_COLOR))]
+        group = np.array([_SIG_GROUP[sig] for sig in records['sig'].tolist()], dtype=np.int32)
+        records = records[np.lexsort((records['ch'], group))]
+
+        keys = tuple(zip(records['ch'].tolist(), records['sat'].tolist(), records['sig'].tolist()))
+        full = keys != self.keys or self._background is None
+        if full:
+            self._layout(keys)
+        heights = records['cn0'].tolist()
+        for bar, height in zip(self.bars, heights):
+            bar.set_height(height)
+        if heights and max(heights) > self.ax.get_ylim()[1]:
+            self.ax.set_ylim(0, 10 * math.ceil(max(heights) / 10))
+            full = True
+
+        if full:
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_bars()
+            self.canvas.blit(self.ax.bbox)
+        return True
+
+    def clear(self):
+        for bar in self.bars:
+            bar.remove()
+        self.bars = []
+        self.keys = None
+        self.ax.set_xticks([])
@@ -0,0 +1,159 @@
+import sys
+import threading
+import time
+from collections import deque
+
+# Serial (and other) NMEA output.
+#
+# send_data_to_com used to write and then time.sleep(1 / hz), so every
+# period was the sleep plus nmea_adjustment plus the write, the output
+# drifted further behind every second and a slow receiver got the same
+# epoch twice. It also opened the port at 9600 baud whatever rate was
+# selected. EpochSender is driven by the NMEA pipeline instead: it is
+# handed the bytes of each completed NmeaEpoch, serialised once before the
+# fan-out, and writes them with a single write() call.
+#
+# Without a target rate every epoch is written as soon as it arrives. With
+# one, writes are paced by absolute time.monotonic() deadlines
+# (start + n * period): each slot sends the newest epoch not sent yet, so
+# the output period does not follow the jitter of the input, a slow write
+# shortens the next wait instead of shifting all later slots, and a slot
+# missed entirely is counted and skipped rather than sent in a burst. The
+# last few milliseconds before a deadline are spun instead of slept,
+# because sleeps on Windows are only as fine as the timer tick (about
+# 15 ms). Every payload is checked against the link budget, the time the
+# UART needs to shift it out at the selected baud, whether or not a rate
+# is set.
+
+OUTPUT_RATES = ('0.5', '1', '5', '10', '20')
+BITS_PER_BYTE = 10  # 8N1: start bit, 8 data bits, stop bit
+
+
+def link_time(nbytes, baud, bits_per_byte=BITS_PER_BYTE):
+    """Seconds a serial link at baud needs for nbytes."""
+    return nbytes * bits_per_byte / baud
+
+
+class EpochSender:
+    def __init__(self, write, hz=None, baud=None, max_pending=8, spin=0.002, label="COM"):
+        """publish(data) from the NMEA thread; run() writes it on the sender thread.
+
+        hz: optional target rate; one write per 1/hz slot, of the newest epoch
+        published since the last one. baud: enables the link budget check.
+        max_pending: epochs queued while the port is busy, beyond that the
+        oldest is dropped. spin: final part of each wait that is busy-waited.
+        label: prefix of the printed statistics.
+        """
+        self.write = write
+        self.period = 1.0 / float(hz) if hz else None
+        self.baud = int(baud) if baud else None
+        self.spin = spin
+        self.label = label
+        self._pending = deque(maxlen=max_pending)
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._last_received = None
+        self.received = 0
+        self.sent = 0
+        self.bytes = 0
+        self.decimated = 0        # superseded by a newer epoch before their slot
+        self.dropped = 0          # pushed out of a full queue
+        self.budget_overruns = 0
+        self.missed = 0           # slots skipped because a write ran past the next deadline
+        self.empty = 0            # slots without a new epoch
+        self.max_jitter = 0.0     # worst write start after its deadline (s)
+        self.max_busy = 0.0       # worst write time (s)
+        self.max_latency = 0.0    # published -> written (s)
+
+    def publish(self, data):
+        """Queue the bytes of one epoch, stamped with the time they were handed over."""
+        with self._cond:
+            self.received += 1
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1
+            self._pending.append((time.monotonic(), data))
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stop_event.set()
+            self._cond.notify()
+
+    def _next(self):
+        # Oldest queued (received, data), None once stopped
+        with self._cond:
+            while not self._pending and not self._stop_event.is_set():
+                self._cond.wait()
+            if self._stop_event.is_set():
+                return None
+            return self._pending.popleft()
+
+    def _newest(self):
+        # Newest queued (received, data), None if nothing arrived since the last slot
+        with self._cond:
+            if not self._pending:
+                return None
+            self.decimated += len(self._pending) - 1
+            item = self._pending.pop()
+            self._pending.clear()
+            return item
+
+    def _wait_until(self, deadline):
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            if remaining > self.spin:
+                if self._stop_event.wait(remaining - self.spin):
+                    return False
+            elif self._stop_event.is_set():
+                return False
+
+    def run(self):
+        """Send until stop(); runs on the caller's thread."""
+        if self.period is None:
+            while True:
+                item = self._next()
+                if item is None:
+                    return
+                self._send(*item)
+        deadline = time.monotonic()
+        while self._wait_until(deadline):
+            start = time.monotonic()
+            self.max_jitter = max(self.max_jitter, start - deadline)
+            item = self._newest()
+            if item is None:
+                self.empty += 1
+            else:
+                self._send(*item)
+            now = time.monotonic()
+            self.max_busy = max(self.max_busy, now - start)
+            deadline += self.period
+            if now > deadline:
+                # Skip the slots we ran over instead of sending them back to back
+                missed = int((now - deadline) / self.period) + 1
+                self.missed += missed
+                deadline += missed * self.period
+
+    def _send(self, received, data):
+        # Budget: the slot period, or without a rate the time since the previous epoch
+        period = self.period
+        if period is None and self._last_received is not None:
+            period = received - self._last_received
+        self._last_received = received
+        if self.baud and period and link_time(len(data), self.baud) > period:
+            self.budget_overruns += 1
+            if self.budget_overruns == 1:
+                print(f"[{self.label}] {len(data)} bytes need {link_time(len(data), self.baud) * 1000:.0f} ms "
+                      f"at {self.baud} baud, more than the {period * 1000:.0f} ms period", file=sys.stderr)
+        self.write(data)
+        self.max_latency = max(self.max_latency, time.monotonic() - received)
+        self.sent += 1
+        self.bytes += len(data)
+
+    def report(self):
+        paced = (f"{self.missed} slots missed, {self.empty} empty, max jitter {self.max_jitter * 1000:.1f} ms, "
+                 f"max busy {self.max_busy * 1000:.1f} ms, " if self.period else "")
+        print(f"[{self.label}] {self.received} epochs received, {self.sent} sent ({self.bytes} B), "
+              f"{self.decimated} decimated, {self.dropped} dropped, {self.budget_overruns} over budget, "
+              f"{paced}max latency {self.max_latency * 1000:.1f} ms", file=sys.stderr)
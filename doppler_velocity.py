@@ -0,0 +1,147 @@
+import math
+from collections import deque
+
+import numpy as np
+
+# Receiver velocity from the tracking channels' Doppler.
+#
+# Each channel row carries its carrier Doppler (DOP, Hz), i.e. a range rate
+#
+#     rr_s = -lambda * f_D = -u_s . v_rx + k_s(t)
+#
+# where u_s is the receiver-to-satellite unit vector (from the GSV
+# azimuth/elevation) and k_s = u_s . v_sat + c * clock drift. Without
+# ephemeris there is no satellite velocity, so k_s is not known a priori.
+# It can be passed in (sat_range_rates), otherwise it is calibrated from
+# the NMEA fixes: at every RMC/VTG epoch the receiver velocity is known
+# from speed and course, which gives k_s for each tracked satellite, and
+# k_s is extrapolated linearly from the last two anchors until the next
+# fix. k_s changes by well under 1 m/s per second, so between NMEA epochs
+# the channel table yields velocity at the tracking rate. All satellites
+# of an epoch are solved together in one least-squares call for
+# (v_east, v_north, v_up, common bias).
+
+C = 299792458.0
+
+# Carrier frequency (Hz) per channel signal; GLONASS FDMA channels are skipped
+SIGNAL_FREQ = {
+    "L1CA": 1575.42e6, "L1CB": 1575.42e6, "L1CP": 1575.42e6, "L1CD": 1575.42e6,
+    "E1B": 1575.42e6, "E1C": 1575.42e6, "B1CD": 1575.42e6, "B1CP": 1575.42e6,
+    "L2CM": 1227.60e6,
+    "L5I": 1176.45e6, "L5Q": 1176.45e6, "E5AI": 1176.45e6, "E5AQ": 1176.45e6,
+    "B2AD": 1176.45e6, "B2AP": 1176.45e6,
+    "E5BI": 1207.14e6, "E5BQ": 1207.14e6, "B2I": 1207.14e6, "B2BI": 1207.14e6,
+    "B1I": 1561.098e6,
+    "B3I": 1268.52e6,
+    "E6B": 1278.75e6, "E6C": 1278.75e6,
+}
+
+_SYSTEM_PREFIX = {"GPS": "G", "Galileo": "E", "BeiDou": "C", "GLONASS": "R", "QZSS": "J"}
+
+
+def sat_id(system, prn):
+    """Channel table satellite ID (G05, E21, C37, ...) for a GSV system name and PRN, None if unknown."""
+    prefix = _SYSTEM_PREFIX.get(system)
+    if prefix is None or prn is None:
+        return None
+    if system == "GLONASS" and prn > 64:
+        prn -= 64
+    elif system == "GPS" and 193 <= prn <= 202:
+        prefix, prn = "J", prn - 192
+    elif system == "GPS" and prn > 32:
+        return None  # SBAS
+    return f"{prefix}{prn:02d}"
+
+
+class DopplerVelocitySolver:
+    def __init__(self, min_sats=5, max_anchor_age=3.0, min_elevation=10, history=16):
+        self.min_sats = min_sats
+        self.max_anchor_age = max_anchor_age
+        self.min_elevation = min_elevation
+        self._history = deque(maxlen=history)
+        self.reset()
+
+    def reset(self):
+        self._los = {}       # sat -> ENU unit vector to the satellite
+        self._obs = (None, {})   # (t, {(sat, sig): range rate}) of the latest channel epoch
+        self._history.clear()    # recent _obs, to anchor on the epoch closest to a fix
+        self._anchors = {}   # (sat, sig) -> ((t, k), (t_prev, k_prev) or None)
+
+    def update_sky(self, satellites):
+        """Line-of-sight vectors from NmeaEpoch.satellites (system, prn, el, az, snr, signal_id)."""
+        los = dict(self._los)
+        for system, prn, el, az, _snr, _sig in satellites:
+            sat = sat_id(system, prn)
+            if sat is None or el is None or az is None:
+                continue
+            e = math.radians(el)
+            a = math.radians(az)
+            los[sat] = (math.cos(e) * math.sin(a), math.cos(e) * math.cos(a), math.sin(e), el)
+        self._los = los
+
+    def observe(self, t, channels):
+        """Range rates (m/s) of one tracking epoch of ChannelRow; returns the number used."""
+        obs = {}
+        for row in channels:
+            freq = SIGNAL_FREQ.get(row.sig)
+            if freq is None or row.sat not in self._los:
+                continue
+            obs[(row.sat, row.sig)] = -row.dop * C / freq
+        self._obs = (t, obs)
+        self._history.append(self._obs)
+        return len(obs)
+
+    def anchor(self, t, speed, course, vertical=0.0):
+        """Calibrate k_s from a known velocity (speed m/s, course deg true) at time t."""
+        # observe() and anchor() may run on different threads; list() copies the deque atomically
+        history = list(self._history)
+        if not history or course is None:
+            return
+        t_obs, obs = min(history, key=lambda h: abs(h[0] - t))
+        if abs(t - t_obs) > 0.5:
+            return
+        c = math.radians(course)
+        v = (speed * math.sin(c), speed * math.cos(c), vertical)
+        anchors = {}
+        for key, rr in obs.items():
+            u = self._los[key[0]]
+            # k is referred to the channel epoch; the fix is at most 0.5 s away
+            k = rr + u[0] * v[0] + u[1] * v[1] + u[2] * v[2]
+            prev = self._anchors.get(key)
+            anchors[key] = ((t_obs, k), prev[0] if prev and prev[0][0] < t_obs else None)
+        self._anchors = anchors
+
+    def solve(self, t=None, sat_range_rates=None):
+        """(speed, v_east, v_north, v_up) in m/s from the latest observe(), or None with too few satellites.
+
+        sat_range_rates: optional {sat: u . v_sat + c * drift} (m/s), e.g. from ephemeris;
+        without it the NMEA anchors are used.
+        """
+        t_obs, obs = self._obs
+        if t_obs is None:
+            return None
+        t = t_obs if t is None else t
+        rows = []
+        y = []
+        for key, rr in obs.items():
+            u = self._los[key[0]]
+            if u[3] < self.min_elevation:
+                continue
+            if sat_range_rates is not None:
+                if key[0] not in sat_range_rates:
+                    continue
+                k = sat_range_rates[key[0]]
+            else:
+                anchor = self._anchors.get(key)
+                if anchor is None or t - anchor[0][0] > self.max_anchor_age:
+                    continue
+                (t1, k1), prev = anchor
+                k = k1
+                if prev is not None:
+                    k += (k1 - prev[1]) / (t1 - prev[0]) * (t - t1)
+            rows.append((-u[0], -u[1], -u[2], 1.0))
+            y.append(rr - k)
+        if len(rows) < self.min_sats:
+            return None
+        sol = np.linalg.lstsq(np.array(rows), np.array(y), rcond=None)[0]
+        return float(math.hypot(sol[0], sol[1])), float(sol[0]), float(sol[1]), float(sol[2])
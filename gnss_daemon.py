@@ -0,0 +1,372 @@
+import argparse
+import json
+import signal
+import socket
+import sys
+import threading
+import time
+
+from line_framer import LineFramer
+from track_epoch import TrackEpochAssembler
+from channel_store import ChannelStore
+from cep_estimator import StreamingCEP
+from window_stats import WindowedSpeedStats
+from nmea_fields import UtcClock
+from nmea_epoch import NmeaEpochAssembler
+from nmea_sentences import SentenceReassembler
+from kinematics import KinematicsEngine, METHODS
+from nmea_fanout import NmeaFanOut, parse_output
+from stream_relay import StreamRelay
+
+# Headless capture daemon.
+#
+# The ingest and compute pipeline used to exist only inside PocketSDRGUI,
+# which needs a Tk root and builds three Matplotlib figures before the
+# first byte is read. GnssDaemon runs the same readers and engines (line
+# framing, NMEA epochs, kinematics, tracking epochs, CEP and RMS velocity)
+# without importing tkinter or matplotlib, reconnects on its own when a
+# stream drops, and prints one JSON line of statistics per interval to
+# stdout, or to every client of a local TCP port. Run one per receiver:
+#
+#   python gnss_daemon.py --nmea 127.0.0.1:4848 --track 127.0.0.1:6868 --log run.txt
+#   python gnss_daemon.py --stats-port 7000 --quiet      (then: nc 127.0.0.1 7000)
+#
+# --output (repeatable) retransmits the NMEA epochs, see nmea_fanout:
+#
+#   python gnss_daemon.py --output serial:COM3:4800,hz=1 --output udp:10110,only=GGA+RMC
+#
+# --relay-nmea / --relay-track re-serve the input streams to any number of
+# clients, so other tools need not open a second receiver connection:
+#
+#   python gnss_daemon.py --relay-nmea 14848 --relay-track 16868
+
+
+def _address(text):
+    host, _, port = text.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def _output(spec):
+    # argparse only shows its own message for a plain ValueError
+    try:
+        return parse_output(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+class StatsServer:
+    # Local TCP port that writes every stats line to all connected clients
+    def __init__(self, port, host='127.0.0.1'):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(4)
+        self.sock.settimeout(0.5)
+        self.clients = []
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+
+    def _accept(self):
+        while self.sock.fileno() != -1:
+            try:
+                conn, addr = self.sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            # A stalled client must not hold up the daemon
+            conn.settimeout(1.0)
+            print(f"[Stats] client {addr[0]}:{addr[1]} connected", file=sys.stderr)
+            with self._lock:
+                self.clients.append(conn)
+
+    def send(self, line):
+        data = (line + "\n").encode('utf-8')
+        with self._lock:
+            for conn in list(self.clients):
+                try:
+                    conn.sendall(data)
+                except OSError:
+                    self.clients.remove(conn)
+                    conn.close()
+
+    def close(self):
+        self.sock.close()
+        with self._lock:
+            for conn in self.clients:
+                conn.close()
+            self.clients = []
+
+
+class GnssDaemon:
+    def __init__(self, nmea=('127.0.0.1', 4848), track=('127.0.0.1', 6868), log_file_path=None,
+                 stats_interval=1.0, stats_port=None, quiet=False, max_samples=1000,
+                 kinematics_method='savgol', retry_delay=1.5, outputs=(), relay_nmea=None, relay_track=None,
+                 relay_host='127.0.0.1'):
+        self.nmea = nmea
+        self.track = track
+        self.log_file_path = log_file_path
+        self.stats_interval = stats_interval
+        self.stats_port = stats_port
+        self.quiet = quiet
+        self.retry_delay = retry_delay
+        self.outputs = list(outputs)  # (output, hz, kinds) from nmea_fanout.parse_output
+        self.relays = {}
+        if relay_nmea:
+            self.relays['nmea'] = StreamRelay(relay_nmea, relay_host, name="NMEA relay")
+        if relay_track:
+            self.relays['track'] = StreamRelay(relay_track, relay_host, name="Track relay", newline='\n')
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self.log_file = None
+        self.stats_server = None
+        self.threads = []
+
+        self.utc_clock = UtcClock()
+        self.kinematics = KinematicsEngine(kinematics_method)
+        self.channel_store = ChannelStore()
+        self.cep_estimator = StreamingCEP(max_samples)
+        self.speed_stats = WindowedSpeedStats(max_samples)
+        # Sentences are passed on as received, no rewrites
+        self.fanout = NmeaFanOut()
+
+        self.first_time = None
+        self.current_utc_seconds = 0
+        self.velocity_ms = self.acceleration = self.jerk = 0.0
+        self.cep = self.vrms = 0.0
+        self.position = None
+        self.old_time = ""
+        self.nmea_epochs = 0
+        self.track_epochs = 0
+        self.connected = {'nmea': False, 'track': False}
+
+    # ---------------------- lifecycle ----------------------
+    def start(self):
+        if self.log_file_path:
+            self.log_file = open(self.log_file_path, 'a', encoding='utf-8')
+            self.log_file.write(f"--- Logging Started: {time.ctime()} ---\n")
+            self.log_file.flush()
+        if self.stats_port:
+            self.stats_server = StatsServer(self.stats_port)
+        for output, hz, kinds in self.outputs:
+            self.fanout.add(output, hz, kinds)
+        for name, relay in list(self.relays.items()):
+            if not relay.start():
+                del self.relays[name]
+        self.threads = [
+            threading.Thread(target=self.read_nmea, daemon=True),
+            threading.Thread(target=self.read_tracking, daemon=True),
+        ]
+        for th in self.threads:
+            th.start()
+
+    def stop(self):
+        self.stop_event.set()
+        for th in self.threads:
+            th.join(timeout=2)
+        if self.stats_server:
+            self.stats_server.close()
+        self.fanout.stop()
+        for relay in self.relays.values():
+            relay.stop()
+        if self.log_file:
+            self.log_file.write(f"--- Logging Stopped: {time.ctime()} ---\n")
+            self.log_file.close()
+            self.log_file = None
+
+    def _on_signal(self, signum, frame):
+        print(f"[Daemon] {signal.Signals(signum).name}, stopping", file=sys.stderr)
+        self.stop_event.set()
+
+    def run(self):
+        """Publish stats every stats_interval until stop(), Ctrl+C or SIGTERM."""
+        next_report = time.monotonic() + self.stats_interval
+        # A service manager stops us with SIGTERM; both signals end the loop so stop() closes the outputs
+        previous = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                previous[signum] = signal.signal(signum, self._on_signal)
+        try:
+            while not self.stop_event.wait(max(0.0, next_report - time.monotonic())):
+                next_report += self.stats_interval
+                self.publish(json.dumps(self.stats()))
+                if self.log_file:
+                    with self._log_lock:
+                        self.log_file.flush()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+            self.stop()
+
+    def publish(self, line):
+        if not self.quiet:
+            print(line, flush=True)
+        if self.stats_server:
+            self.stats_server.send(line)
+
+    def log(self, line):
+        if self.log_file:
+            with self._log_lock:
+                self.log_file.write(line + "\n")
+
+    # ---------------------- readers ----------------------
+    def _read_stream(self, name, address, framer, on_chunk, on_close, on_idle=None, idle=0.05):
+        # Reconnects until stop(); an unattended daemon never gives up on a stream.
+        # on_idle() runs every `idle` s while the stream is quiet.
+        host, port = address
+        while not self.stop_event.is_set():
+            sock = None
+            try:
+                sock = socket.create_connection((host, port), timeout=10)
+                print(f"[{name}] connected to {host}:{port}", file=sys.stderr)
+                self.connected[name] = True
+                framer.reset()
+                while not self.stop_event.is_set():
+                    if not framer.wait(sock, idle):
+                        if on_idle:
+                            on_idle()
+                        continue
+                    if not framer.recv_from(sock):
+                        break
+                    on_chunk()
+                on_close()
+            except (ConnectionRefusedError, socket.timeout) as e:
+                print(f"[{name}] {host}:{port}: {e}", file=sys.stderr)
+            except OSError as e:
+                print(f"[{name}] error: {e}", file=sys.stderr)
+            finally:
+                self.connected[name] = False
+                if sock:
+                    sock.close()
+            self.stop_event.wait(self.retry_delay)
+
+    def read_nmea(self):
+        framer = LineFramer(2048)
+        reassembler = SentenceReassembler()
+        epochs = NmeaEpochAssembler(self.process_nmea_epoch, clock=self.utc_clock)
+        relay = self.relays.get('nmea')
+
+        def on_chunk():
+            sentences = list(reassembler.sentences(framer.lines()))
+            for line in sentences:
+                self.log(line)
+                epochs.feed_line(line)
+            if relay:
+                relay.feed_lines(sentences)
+
+        def on_close():
+            epochs.flush()
+            reassembler.reset()
+
+        self._read_stream('nmea', self.nmea, framer, on_chunk, on_close, epochs.poll)
+
+    def read_tracking(self):
+        framer = LineFramer(4096, encoding='utf-8')
+        assembler = TrackEpochAssembler(self.apply_track_epoch)
+        relay = self.relays.get('track')
+
+        def on_chunk():
+            lines = list(framer.lines())
+            for line in lines:
+                assembler.feed(line)
+            if relay:
+                relay.feed_lines(lines)
+
+        self._read_stream('track', self.track, framer, on_chunk, assembler.flush, assembler.poll)
+
+    # ---------------------- engines ----------------------
+    def process_nmea_epoch(self, epoch):
+        self.fanout.publish(epoch)
+        if epoch.time is None:
+            return
+        with self._lock:
+            self.nmea_epochs += 1
+            if self.first_time is None:
+                self.first_time = epoch.time
+            self.current_utc_seconds = epoch.time
+            if epoch.speed_knots is None:
+                return
+            estimate = self.kinematics.update(epoch.time, epoch.speed_knots * 0.5144444)
+            if estimate is not None:
+                self.velocity_ms, self.acceleration, self.jerk = estimate
+
+    def apply_track_epoch(self, epoch):
+        with self._lock:
+            self.track_epochs += 1
+            if epoch.channels:
+                self.channel_store.apply_epoch(epoch.channels, epoch.status is not None)
+            if epoch.status:
+                self.log(epoch.status)
+                self.parse_position_status(epoch.status)
+
+    def parse_position_status(self, line):
+        # Same fields as PocketSDRGUI.parse_position_status: date time lat lon alt fix ...
+        parts = line.split()
+        if len(parts) < 6:
+            return
+        try:
+            lat, lon, alt = float(parts[2]), float(parts[3]), float(parts[4])
+        except ValueError:
+            return
+        self.position = (f"{parts[0]} {parts[1]}", lat, lon, alt, parts[5])
+        if parts[2] != '0.00000000' and parts[1] != self.old_time:
+            self.cep = self.cep_estimator.add(lat, lon)
+            self.vrms = self.speed_stats.add(self.velocity_ms, self.current_utc_seconds)
+            self.old_time = parts[1]
+
+    def stats(self):
+        with self._lock:
+            position = self.position or (None, None, None, None, None)
+            return {
+                'time': position[0],
+                'lat': position[1],
+                'lon': position[2],
+                'alt': position[3],
+                'fix': position[4],
+                'utc_s': self.current_utc_seconds,
+                'velocity': round(self.velocity_ms, 3),
+                'acceleration': round(self.acceleration, 3),
+                'jerk': round(self.jerk, 3),
+                'max_jerk': round(self.kinematics.max_jerk, 3),
+                'cep': round(self.cep, 3),
+                'vrms': round(self.vrms, 3),
+                'channels': len(self.channel_store),
+                'nmea_epochs': self.nmea_epochs,
+                'track_epochs': self.track_epochs,
+                'nmea_connected': self.connected['nmea'],
+                'track_connected': self.connected['track'],
+                'outputs': self.fanout.names(),
+                'relay_clients': {name: relay.clients for name, relay in self.relays.items()},
+            }
+
+
+def main(argv=None):
+    t0 = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Headless NMEA / tracking capture daemon")
+    parser.add_argument('--nmea', type=_address, default=('127.0.0.1', 4848), metavar='HOST:PORT')
+    parser.add_argument('--track', type=_address, default=('127.0.0.1', 6868), metavar='HOST:PORT')
+    parser.add_argument('--log', dest='log_file_path', metavar='PATH', help="append NMEA and status lines to a log file")
+    parser.add_argument('--interval', dest='stats_interval', type=float, default=1.0, help="stats period (s)")
+    parser.add_argument('--stats-port', type=int, help="also serve stats on 127.0.0.1:PORT")
+    parser.add_argument('--quiet', action='store_true', help="do not print stats to stdout")
+    parser.add_argument('--method', dest='kinematics_method', choices=METHODS, default='savgol')
+    parser.add_argument('--output', dest='outputs', type=_output, action='append', default=[], metavar='SPEC',
+                        help="retransmit NMEA, e.g. serial:COM3:4800,hz=1 tcp:10110 udp:10110,only=GGA+RMC file:PATH")
+    parser.add_argument('--relay-nmea', type=int, metavar='PORT', help="re-serve the NMEA stream to any number of clients")
+    parser.add_argument('--relay-track', type=int, metavar='PORT', help="re-serve the tracking stream to any number of clients")
+    parser.add_argument('--relay-host', default='127.0.0.1', help="address the relays listen on (default 127.0.0.1)")
+    args = parser.parse_args(argv)
+
+    daemon = GnssDaemon(**vars(args))
+    daemon.start()
+    print(f"[Daemon] started in {time.perf_counter() - t0:.3f} s "
+          f"(NMEA {args.nmea[0]}:{args.nmea[1]}, tracking {args.track[0]}:{args.track[1]})", file=sys.stderr)
+    daemon.run()
+
+
+if __name__ == "__main__":
+    main()
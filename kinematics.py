@@ -0,0 +1,116 @@
+import numpy as np
+
+from ring_buffer import RingSeries
+from window_stats import WindowedMax
+
+# Speed, acceleration and jerk estimates from per-epoch speed samples.
+#
+# process_nmea_epoch used to take first and second differences between
+# consecutive epochs. At 10 Hz the 0.01 kn speed resolution alone turns
+# into about +-1 m/s^3 of jerk, so the jerk trace was mostly quantisation noise.
+# KinematicsEngine keeps the recent samples in a RingSeries and offers
+#
+#   savgol:  least-squares polynomial over the last `window` samples
+#            (Savitzky-Golay, evaluated at the newest sample; works with
+#            uneven epoch spacing),
+#   central: central differences across the window (centred half a
+#            window back, so they lag the other two),
+#   abg:     alpha-beta-gamma tracking filter, O(1) per sample.
+#
+# The maximum jerk is tracked over the last `max_window` estimates.
+
+METHODS = ('savgol', 'central', 'abg')
+
+
+class KinematicsEngine:
+    def __init__(self, method='savgol', window=11, order=3, max_window=500,
+                 alpha=0.5, beta=0.3, gamma=0.05):
+        if method not in METHODS:
+            raise ValueError(f"Unknown kinematics method {method!r}, expected one of {METHODS}")
+        self.method = method
+        self.window = window
+        self.order = order
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.samples = RingSeries(('speed',), capacity=max(window, 3))
+        self.jerk_max = WindowedMax(max_window)
+        self.reset()
+
+    def reset(self):
+        self.samples.clear()
+        self.jerk_max.reset()
+        self._last_t = None
+        self._state = None
+
+    def set_method(self, method):
+        if method not in METHODS:
+            raise ValueError(f"Unknown kinematics method {method!r}, expected one of {METHODS}")
+        self.method = method
+        self.reset()
+
+    @property
+    def max_jerk(self):
+        return self.jerk_max.max
+
+    def update(self, t, speed):
+        """Add a speed sample (m/s) at time t (s). Returns (speed, acceleration, jerk), or None if t did not advance."""
+        if self._last_t is not None and t - self._last_t <= 0.001:
+            return None
+        dt = None if self._last_t is None else t - self._last_t
+        self._last_t = t
+        self.samples.append(t, speed)
+        if self.method == 'abg':
+            estimate = self._abg(speed, dt)
+        else:
+            times, values = self.samples.snapshot('speed')
+            if self.method == 'savgol':
+                estimate = self._savgol(times, values)
+            else:
+                estimate = self._central(times, values)
+        self.jerk_max.add(estimate[2])
+        return estimate
+
+    def _savgol(self, times, values):
+        n = len(values)
+        order = min(self.order, n - 1)
+        if order < 1:
+            return float(values[-1]), 0.0, 0.0
+        # Fit v(tau) = c0 + c1 tau + c2 tau^2 + ... with tau = t - t_newest, scaled for conditioning
+        scale = max(times[-1] - times[0], 1e-3)
+        tau = (times - times[-1]) / scale
+        vander = np.vander(tau, order + 1, increasing=True)
+        coef = np.linalg.lstsq(vander, values, rcond=None)[0]
+        acceleration = coef[1] / scale
+        jerk = 2.0 * coef[2] / scale ** 2 if order >= 2 else 0.0
+        return float(coef[0]), float(acceleration), float(jerk)
+
+    def _central(self, times, values):
+        n = len(values)
+        k = (n - 1) // 2
+        if k < 1:
+            return float(values[-1]), 0.0, 0.0
+        # Three points k samples apart: wide stencils divide the quantisation
+        # noise by k (acceleration) and k^2 (jerk)
+        t0, t1, t2 = times[-1 - 2 * k], times[-1 - k], times[-1]
+        v0, v1, v2 = values[-1 - 2 * k], values[-1 - k], values[-1]
+        h1 = t1 - t0
+        h2 = t2 - t1
+        acceleration = (v2 - v0) / (h1 + h2)
+        jerk = 2.0 * (v0 / (h1 * (h1 + h2)) - v1 / (h1 * h2) + v2 / (h2 * (h1 + h2)))
+        return float(values[-1]), float(acceleration), float(jerk)
+
+    def _abg(self, speed, dt):
+        if self._state is None or dt is None:
+            self._state = (speed, 0.0, 0.0)
+            return self._state
+        v, a, j = self._state
+        # Predict, then correct with the speed residual
+        v_p = v + a * dt + 0.5 * j * dt * dt
+        a_p = a + j * dt
+        r = speed - v_p
+        v = v_p + self.alpha * r
+        a = a_p + self.beta * r / dt
+        j = j + 2.0 * self.gamma * r / (dt * dt)
+        self._state = (v, a, j)
+        return self._state
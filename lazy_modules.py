@@ -0,0 +1,78 @@
+import importlib
+import sys
+import time
+
+# Deferred imports and a startup timing report for the GUIs.
+#
+# The GUIs used to import matplotlib.pyplot, the TkAgg backend, PIL,
+# pyserial, pygetwindow and ctypes (loading libsdr, which nothing called)
+# at module top and to build all three figures in __init__, so several
+# seconds passed before the window (and its satellite table) appeared. A LazyModule stands in for a module and
+# imports it on first attribute access, the plot tabs build their figures
+# the first time they are shown, and StartupTimer prints where the time
+# went, including the first-use loads that happen after the window is up.
+
+
+class StartupTimer:
+    def __init__(self, label="Startup"):
+        self.label = label
+        self.t0 = time.perf_counter()
+        self.marks = []
+
+    def mark(self, what):
+        """Record the time since the timer started, e.g. mark("window built")."""
+        elapsed = time.perf_counter() - self.t0
+        self.marks.append((what, elapsed))
+        return elapsed
+
+    def timed(self, what, func, *args):
+        """Run func(*args) and report how long it took."""
+        t = time.perf_counter()
+        result = func(*args)
+        print(f"[{self.label}] {what}: {(time.perf_counter() - t) * 1000:.0f} ms")
+        return result
+
+    def finish(self, what):
+        """Last mark, then print the report."""
+        self.mark(what)
+        self.report()
+
+    def report(self):
+        prev = 0.0
+        print(f"[{self.label}] timing report")
+        for what, elapsed in self.marks:
+            print(f"[{self.label}]   {elapsed * 1000:7.0f} ms  (+{(elapsed - prev) * 1000:5.0f})  {what}")
+            prev = elapsed
+
+
+class LazyModule:
+    def __init__(self, name, timer=None):
+        """Proxy for module `name`; the import happens on first attribute access."""
+        self.__dict__['_name'] = name
+        self.__dict__['_timer'] = timer
+        self.__dict__['_module'] = sys.modules.get(name)
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            t = time.perf_counter()
+            module = importlib.import_module(self._name)
+            self.__dict__['_module'] = module
+            if self._timer is not None:
+                print(f"[{self._timer.label}] {self._name} loaded on first use: "
+                      f"{(time.perf_counter() - t) * 1000:.0f} ms")
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
@@ -0,0 +1,109 @@
+# Line framing for the NMEA and tracking TCP streams.
+#
+# The readers used to do `buffer += data` followed by repeated
+# `buffer.split('\n', 1)`, which re-copies the unread tail once per line.
+# A burst of 30+ GSV sentences in one recv therefore costs O(n^2).
+# LineFramer receives straight into a preallocated buffer with recv_into,
+# appends it to one bytearray and walks it with find(), compacting the
+# consumed prefix only once per recv.
+#
+# wait() lets a reader notice that its stream went quiet (to close a
+# pending epoch) without giving up the socket's own timeout, which still
+# detects a dead stream.
+
+import select
+import socket
+import time
+
+
+class LineFramer:
+    def __init__(self, bufsize=4096, encoding='ascii', errors='ignore', max_line=65536):
+        self.encoding = encoding
+        self.errors = errors
+        self.max_line = max_line
+        self._chunk = bytearray(bufsize)
+        self._view = memoryview(self._chunk)
+        self._buf = bytearray()
+        self._pos = 0
+        self.last_size = 0
+        self.dropped = 0
+        self._last_data = None
+
+    def recv_from(self, sock):
+        """Receive one chunk from sock. Returns the byte count, 0 on EOF."""
+        n = sock.recv_into(self._view)
+        self.last_size = n
+        self._last_data = time.monotonic()
+        if n:
+            self._buf += self._view[:n]
+        return n
+
+    def wait(self, sock, idle):
+        """True once sock is readable, False after `idle` s without data.
+
+        Raises socket.timeout once the stream has been silent for longer
+        than sock.gettimeout(), like a blocking recv would.
+        """
+        if select.select([sock], [], [], idle)[0]:
+            return True
+        now = time.monotonic()
+        if self._last_data is None:
+            self._last_data = now - idle
+        limit = sock.gettimeout()
+        if limit is not None and now - self._last_data >= limit:
+            raise socket.timeout(f"no data for {now - self._last_data:.0f} s")
+        return False
+
+    def feed(self, data):
+        """Append already received bytes (e.g. from a file or serial port)."""
+        self._buf += data
+        self.last_size = len(data)
+
+    def last_chunk(self):
+        """Text of the most recent recv, for callers that still need the raw chunk."""
+        return str(self._view[:self.last_size], self.encoding, self.errors)
+
+    def lines(self):
+        """Yield every complete line currently buffered, without the line terminator."""
+        buf = self._buf
+        pos = self._pos
+        try:
+            while True:
+                end = buf.find(b'\n', pos)
+                if end < 0:
+                    break
+                stop = end - 1 if end > pos and buf[end - 1] == 0x0D else end
+                line = str(memoryview(buf)[pos:stop], self.encoding, self.errors)
+                pos = end + 1
+                self._pos = pos
+                yield line
+        finally:
+            self._compact()
+
+    def pending(self):
+        """Number of buffered bytes that do not yet form a complete line."""
+        return len(self._buf) - self._pos
+
+    def reset(self):
+        self._buf.clear()
+        self._pos = 0
+        self.last_size = 0
+        self._last_data = None
+
+    def _compact(self):
+        if self._pos:
+            del self._buf[:self._pos]
+            self._pos = 0
+        if len(self._buf) > self.max_line:
+            # No terminator in sight, the peer is not sending line data
+            self.dropped += len(self._buf)
+            self._buf.clear()
+
+
+def iter_socket_lines(sock, framer, stop_event=None):
+    """Yield lines from sock until EOF or until stop_event is set."""
+    while stop_event is None or not stop_event.is_set():
+        n = framer.recv_from(sock)
+        if not n:
+            return
+        yield from framer.lines()
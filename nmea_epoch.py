@@ -0,0 +1,179 @@
+import time
+from collections import deque, namedtuple
+
+from nmea_fields import UtcClock
+from nmea_sentences import decode_sentence
+
+# Epoch grouping for the NMEA stream.
+#
+# process_line used to be a state machine (statusGGA, state 0/1/2,
+# first_time, last_processed_time) that took the time from the last GGA
+# and the speed from whichever RMC/VTG came next, so a speed could be
+# paired with the previous epoch's time. The receiver sends one burst of
+# sentences per fix; NmeaEpochAssembler collects the burst, keyed by the
+# UTC time of its timed sentences, and hands one NmeaEpoch per fix to the
+# consumers.
+#
+# An epoch is closed by the data itself, never by how the bytes were split
+# into TCP segments:
+#  - as soon as it holds every group the previous epoch had (the
+#    once-per-fix types, the last GSV page of each talker/signal, the GSA
+#    of each constellation), so a fix is handed on with its last sentence;
+#  - by a timed sentence with a different UTC, or a second sentence of a
+#    group the epoch already holds, which also puts the GSVs sent ahead of
+#    the next RMC into the next epoch;
+#  - by a gap between bursts: the reader calls poll() while its socket is
+#    quiet, and silence longer than half the observed epoch period (at
+#    most `timeout` s) ends the burst.
+# The expected groups follow the receiver: an epoch with more groups
+# raises the set at once, two short epochs in a row (a constellation lost)
+# lower it.
+
+# time:       monotonic UTC seconds (see nmea_fields.UtcClock), None if no timed sentence
+# utc:        seconds of day as sent
+# lat/lon:    decimal degrees; alt in metres (GGA, lat/lon fall back to RMC)
+# speed_knots/course: from RMC, or VTG when there is no RMC
+# satellites: (system, prn, elevation, azimuth, snr, signal_id) per GSV entry
+# sentences:  the decoded sentences of the epoch in arrival order
+# received:   time.monotonic() when the epoch's first sentence arrived, so it
+#             does not depend on how long the epoch took to close
+NmeaEpoch = namedtuple('NmeaEpoch', [
+    'time', 'utc', 'lat', 'lon', 'alt', 'quality', 'num_sats', 'speed_knots', 'course',
+    'pdop', 'hdop', 'vdop', 'satellites', 'sentences', 'received'])
+
+# Sentences that appear once per epoch; a second one starts the next epoch
+_ONCE_PER_EPOCH = frozenset(('GGA', 'RMC', 'VTG', 'GST', 'ZDA'))
+
+
+def _group_key(sentence):
+    # Identity of a sentence within one epoch, None if it may repeat
+    kind = sentence.kind
+    if kind in _ONCE_PER_EPOCH:
+        return kind
+    if kind == 'GSV':
+        return kind, sentence.talker, sentence.signal_id, sentence.msg_num
+    if kind == 'GSA':
+        # NMEA 4.1 names the constellation; older GNGSA only differ by their satellites
+        return kind, sentence.talker, sentence.system_id if sentence.system_id is not None else tuple(sentence.prns)
+    return None
+
+
+class NmeaEpochAssembler:
+    def __init__(self, emit, clock=None, timeout=1.5, gap=0.5, min_gap=0.05):
+        """emit(NmeaEpoch) is called once per epoch.
+
+        Silence of gap * the observed epoch period, clamped to min_gap..timeout
+        seconds (timeout until a period is known), closes the open epoch.
+        """
+        self.emit = emit
+        self.clock = clock if clock is not None else UtcClock()
+        self.timeout = timeout
+        self.gap = gap
+        self.min_gap = min_gap
+        self._sentences = []
+        self._keys = set()
+        self._done = set()          # groups complete in the open epoch
+        self._expected = frozenset()
+        self._short = 0             # epochs in a row that closed without all expected groups
+        self._utc = None
+        self._start = None
+        self._last = None
+        self._periods = deque(maxlen=8)
+
+    def silence(self):
+        """Seconds without data that end the open epoch."""
+        if not self._periods:
+            return self.timeout
+        period = sorted(self._periods)[len(self._periods) // 2]
+        return min(self.timeout, max(self.min_gap, self.gap * period))
+
+    def feed_line(self, line):
+        """Decode one NMEA line and add it; corrupt or unknown lines are skipped."""
+        sentence = decode_sentence(line)
+        if sentence is not None:
+            self.feed(sentence)
+
+    def feed(self, sentence):
+        now = time.monotonic()
+        if self._sentences and now - self._last > self.silence():
+            self.flush()
+        key = _group_key(sentence)
+        utc = getattr(sentence, 'time', None) if sentence.kind in _ONCE_PER_EPOCH else None
+        if key in self._keys or (utc is not None and self._utc is not None and utc != self._utc):
+            self.flush()
+        if not self._sentences:
+            if self._start is not None:
+                self._periods.append(now - self._start)
+            self._start = now
+        if utc is not None and self._utc is None:
+            self._utc = utc
+        self._sentences.append(sentence)
+        self._last = now
+        if key is None:
+            return
+        self._keys.add(key)
+        if sentence.kind != 'GSV':
+            self._done.add(key)
+        elif sentence.msg_num is not None and sentence.msg_num == sentence.num_msgs:
+            self._done.add(key[:3])
+        if self._expected and self._done >= self._expected:
+            self.flush()
+
+    def poll(self):
+        """Called by the reader while no data arrives; closes the epoch after silence() s."""
+        if self._sentences and time.monotonic() - self._last > self.silence():
+            self.flush()
+
+    def flush(self):
+        if not self._sentences:
+            return
+        sentences = self._sentences
+        utc = self._utc
+        received = self._start
+        done = self._done
+        if done >= self._expected:
+            self._expected = frozenset(done)
+            self._short = 0
+        elif done:
+            self._short += 1
+            if self._short >= 2:
+                self._expected = frozenset(done)
+                self._short = 0
+        self._sentences = []
+        self._keys = set()
+        self._done = set()
+        self._utc = None
+        self.emit(self._build(sentences, utc, received))
+
+    def _build(self, sentences, utc, received):
+        lat = lon = alt = quality = num_sats = None
+        speed = course = vtg_speed = vtg_course = None
+        pdop = hdop = vdop = None
+        satellites = []
+        for s in sentences:
+            kind = s.kind
+            if kind == 'GGA':
+                lat, lon, alt = s.lat, s.lon, s.alt
+                quality, num_sats = s.quality, s.num_sats
+                if s.hdop is not None:
+                    hdop = s.hdop
+            elif kind == 'RMC':
+                if lat is None:
+                    lat, lon = s.lat, s.lon
+                speed, course = s.speed_knots, s.course
+            elif kind == 'VTG':
+                vtg_speed, vtg_course = s.speed_knots, s.course_true
+            elif kind == 'GSA':
+                # One GSA per constellation with the same combined DOPs
+                if pdop is None:
+                    pdop, vdop = s.pdop, s.vdop
+                    if s.hdop is not None:
+                        hdop = s.hdop
+            elif kind == 'GSV':
+                system = s.system
+                for prn, el, az, snr in s.sats:
+                    satellites.append((system, prn, el, az, snr, s.signal_id))
+        if speed is None:
+            speed, course = vtg_speed, vtg_course
+        return NmeaEpoch(self.clock.update(utc), utc, lat, lon, alt, quality, num_sats, speed, course,
+                         pdop, hdop, vdop, tuple(satellites), tuple(sentences), received)
@@ -0,0 +1,282 @@
+import math
+import socket
+import sys
+import threading
+
+from com_scheduler import EpochSender
+from lazy_modules import LazyModule
+
+# NMEA output fan-out.
+#
+# connect_com used to start an unmanaged daemon thread per click that
+# could drive exactly one COM port, so feeding a logger, an autopilot and
+# a display at once needed separate tools. NmeaFanOut holds any number of
+# sinks, each an output (serial port, TCP server, UDP broadcast, file or
+# named pipe) with its own EpochSender, i.e. its own rate, its own
+# sentence filter and its own bounded queue that drops the oldest epoch
+# when the output falls behind. publish() gets the epoch's output lines,
+# already rewritten once by the caller (see nmea_rewrite.NmeaRewriter), so
+# every sink sends the same bytes; it only joins them and appends to the
+# queues, so a slow or stalled sink never holds up the NMEA reader or the
+# other sinks. A sink whose output fails is closed and removed.
+#
+# Sinks can be described as text, for the GUI entry and gnss_daemon --output:
+#
+#   serial:COM3:4800,hz=1          udp:10110,only=GGA+RMC
+#   tcp:10110                      udp:192.168.1.255:10110
+#   file:nmea.log                  file:\\.\pipe\nmea
+
+serial = LazyModule('serial')
+
+
+class SerialOutput:
+    def __init__(self, port, baud=9600):
+        self.name = f"serial:{port}"
+        self.port = port
+        self.baud = int(baud)
+        self.ser = None
+
+    def open(self):
+        # write_timeout: a port nobody drains must not block the sink forever
+        self.ser = serial.Serial(self.port, self.baud, timeout=1, write_timeout=1)
+
+    def write(self, data):
+        self.ser.write(data)
+
+    def close(self):
+        if self.ser:
+            self.ser.close()
+
+
+class TcpServerOutput:
+    # Every connected client gets every epoch; a client that cannot keep up is dropped
+    def __init__(self, port, host='0.0.0.0'):
+        self.name = f"tcp:{port}"
+        self.address = (host, int(port))
+        self.sock = None
+        self.clients = []
+        self._lock = threading.Lock()
+
+    def open(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(self.address)
+        self.sock.listen(8)
+        self.sock.settimeout(0.5)
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while self.sock.fileno() != -1:
+            try:
+                conn, addr = self.sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            conn.settimeout(1.0)
+            print(f"[{self.name}] client {addr[0]}:{addr[1]} connected", file=sys.stderr)
+            with self._lock:
+                self.clients.append(conn)
+
+    def write(self, data):
+        with self._lock:
+            for conn in list(self.clients):
+                try:
+                    conn.sendall(data)
+                except OSError:
+                    self.clients.remove(conn)
+                    conn.close()
+
+    def close(self):
+        if self.sock:
+            self.sock.close()
+        with self._lock:
+            for conn in self.clients:
+                conn.close()
+            self.clients = []
+
+
+class UdpOutput:
+    # One datagram per epoch
+    def __init__(self, port, host='255.255.255.255'):
+        self.name = f"udp:{host}:{port}"
+        self.address = (host, int(port))
+        self.sock = None
+
+    def open(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+    def write(self, data):
+        self.sock.sendto(data, self.address)
+
+    def close(self):
+        if self.sock:
+            self.sock.close()
+
+
+class FileOutput:
+    # Plain file (appended) or a named pipe that another program reads
+    def __init__(self, path):
+        self.name = f"file:{path}"
+        self.path = path
+        self.file = None
+
+    def open(self):
+        self.file = open(self.path, 'ab')
+
+    def write(self, data):
+        self.file.write(data)
+        self.file.flush()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+
+def parse_output(spec):
+    """(output, hz, kinds) for a sink description such as "udp:10110,hz=1,only=GGA+RMC"."""
+    head, *options = spec.strip().split(',')
+    kind, _, target = head.partition(':')
+    if not target:
+        raise ValueError(f"Output {spec!r}: expected KIND:TARGET")
+    if kind == 'serial':
+        port, _, baud = target.rpartition(':') if ':' in target else (target, '', '')
+        output = SerialOutput(port, baud or 9600)
+    elif kind in ('tcp', 'udp'):
+        host, _, port = target.rpartition(':')
+        if kind == 'tcp':
+            output = TcpServerOutput(port, host or '0.0.0.0')
+        else:
+            output = UdpOutput(port, host or '255.255.255.255')
+    elif kind == 'file':
+        output = FileOutput(target)
+    else:
+        raise ValueError(f"Output {spec!r}: unknown kind {kind!r}, expected serial, tcp, udp or file")
+    hz = kinds = None
+    for option in options:
+        key, _, value = option.partition('=')
+        if key == 'hz':
+            try:
+                hz = float(value)
+            except ValueError:
+                raise ValueError(f"Output {spec!r}: hz must be a number, got {value!r}") from None
+            if not (hz > 0 and math.isfinite(hz)):
+                raise ValueError(f"Output {spec!r}: hz must be a positive rate, got {value!r}")
+        elif key == 'only':
+            kinds = value.upper().split('+')
+        else:
+            raise ValueError(f"Output {spec!r}: unknown option {key!r}, expected hz= or only=")
+    return output, hz, kinds
+
+
+def serialise(lines):
+    """One CRLF terminated buffer for output lines (bytes, no line ending)."""
+    return b''.join(line + b'\r\n' for line in lines)
+
+
+class NmeaSink:
+    def __init__(self, output, hz=None, kinds=None, max_pending=8, on_exit=None):
+        """kinds: sentence types to pass (e.g. ('GGA', 'RMC')), None for all."""
+        self.output = output
+        self.name = output.name
+        self.hz = float(hz) if hz else None
+        self.kinds = frozenset(kinds) if kinds else None
+        self.on_exit = on_exit
+        self.sender = EpochSender(output.write, hz=hz, baud=getattr(output, 'baud', None),
+                                  max_pending=max_pending, label=self.name)
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+
+    def payload(self, epoch, lines):
+        """This sink's bytes of one epoch; lines are the output lines of epoch.sentences."""
+        if self.kinds is None:
+            return serialise(lines)
+        return serialise(line for sentence, line in zip(epoch.sentences, lines) if sentence.kind in self.kinds)
+
+    def _run(self):
+        try:
+            self.output.open()
+        except Exception as e:
+            print(f"[{self.name}] cannot open: {e}", file=sys.stderr)
+        else:
+            only = f", only {'+'.join(sorted(self.kinds))}" if self.kinds else ""
+            print(f"[{self.name}] open, {f'{self.hz:g} Hz' if self.hz else 'every epoch'}{only}", file=sys.stderr)
+            try:
+                self.sender.run()
+            except Exception as e:
+                print(f"[{self.name}] write failed: {e}", file=sys.stderr)
+            finally:
+                self.output.close()
+                self.sender.report()
+        if self.on_exit:
+            self.on_exit(self)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self, timeout=2.0):
+        self.sender.stop()
+        if self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+
+
+class NmeaFanOut:
+    def __init__(self):
+        self.sinks = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.sinks
+
+    def names(self, kind=None):
+        """Open sink names, optionally only those of one kind ('serial', 'tcp', ...)."""
+        return [name for name in self.sinks if kind is None or name.startswith(kind + ':')]
+
+    def add(self, output, hz=None, kinds=None, max_pending=8):
+        """Open output on its own thread; ValueError if a sink of that name is already open."""
+        sink = NmeaSink(output, hz, kinds, max_pending, on_exit=self._discard)
+        with self._lock:
+            if output.name in self.sinks:
+                raise ValueError(f"{output.name} is already open")
+            # Copy on write: publish() iterates the dict on the reader thread
+            self.sinks = {**self.sinks, output.name: sink}
+        sink.start()
+        return sink
+
+    def add_spec(self, spec):
+        output, hz, kinds = parse_output(spec)
+        return self.add(output, hz, kinds)
+
+    def _discard(self, sink):
+        with self._lock:
+            if self.sinks.get(sink.name) is sink:
+                self.sinks = {k: v for k, v in self.sinks.items() if v is not sink}
+
+    def remove(self, name):
+        sink = self.sinks.get(name)
+        if sink is not None:
+            self._discard(sink)
+            sink.stop()
+
+    def stop(self):
+        for name in list(self.sinks):
+            self.remove(name)
+
+    def publish(self, epoch, lines=None):
+        """Queue one epoch on every sink; lines: its output lines (bytes), one per sentence, default as received."""
+        sinks = self.sinks
+        if not sinks:
+            return
+        if lines is None:
+            lines = [sentence.line.encode('ascii', 'replace') for sentence in epoch.sentences]
+        data = None
+        for sink in sinks.values():
+            if sink.kinds is None:
+                # Joined once, the same buffer for every unfiltered sink
+                if data is None:
+                    data = serialise(lines)
+                payload = data
+            else:
+                payload = sink.payload(epoch, lines)
+            if payload:
+                sink.sender.publish(payload)
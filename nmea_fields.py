@@ -0,0 +1,110 @@
+from datetime import datetime
+
+# NMEA field decoding without strptime.
+#
+# parse_gpgga ran datetime.strptime (and a second strptime as fallback) on
+# every GGA time field just to get seconds of day. The fields have fixed
+# layouts, hhmmss[.ss] and (d)ddmm.mmmm, so plain slicing and int() do the
+# same job without the format parser or any locale lookups. Time of day
+# wraps at midnight UTC; UtcClock turns it into a monotonic count of
+# seconds that keeps running into the next day.
+
+SECONDS_PER_DAY = 86400
+
+
+def parse_hhmmss(field):
+    """Seconds of day for an NMEA hhmmss[.ss] time field, None if empty or malformed."""
+    if len(field) < 6:
+        return None
+    try:
+        h = int(field[0:2])
+        m = int(field[2:4])
+        s = int(field[4:6])
+        if len(field) == 6:
+            sec = s
+        elif len(field) > 7 and field[6] == '.':
+            frac = field[7:]
+            sec = s + int(frac) / 10 ** len(frac)
+        else:
+            return None
+    except ValueError:
+        return None
+    if h > 23 or m > 59 or s > 60:
+        return None
+    return h * 3600 + m * 60 + sec
+
+
+def parse_latlon(field, hemi):
+    """Signed decimal degrees for a (d)ddmm.mmmm field and its N/S/E/W letter, None if empty or malformed."""
+    dot = field.find('.')
+    if dot < 0:
+        dot = len(field)
+    if dot < 3:
+        return None
+    try:
+        deg = int(field[:dot - 2])
+        minutes = float(field[dot - 2:])
+    except ValueError:
+        return None
+    if minutes >= 60:
+        return None
+    value = deg + minutes / 60
+    return -value if hemi in ('S', 'W') else value
+
+
+class UtcClock:
+    def __init__(self, rollover=SECONDS_PER_DAY / 2):
+        """rollover: a step back in time of day larger than this is taken as midnight."""
+        self.rollover = rollover
+        self.reset()
+
+    def reset(self):
+        self.day = 0
+        self._last = None
+
+    def update(self, seconds_of_day):
+        """Seconds since 00:00 UTC of the first day seen, continuing past midnight; None for a None input."""
+        if seconds_of_day is None:
+            return None
+        if self._last is not None and self._last - seconds_of_day > self.rollover:
+            self.day += 1
+        self._last = seconds_of_day
+        return self.day * SECONDS_PER_DAY + seconds_of_day
+
+
+def _parse_hhmmss_legacy(utc_time):
+    # Previous parse_gpgga time handling, kept for the benchmark below
+    try:
+        t = datetime.strptime(utc_time, "%H%M%S.%f")
+        return t.hour * 3600 + t.minute * 60 + t.second + t.microsecond / 1e6
+    except ValueError:
+        try:
+            t = datetime.strptime(utc_time, "%H%M%S")
+            return t.hour * 3600 + t.minute * 60 + t.second
+        except ValueError:
+            return None
+
+
+if __name__ == "__main__":
+    # Microbenchmark over the GGA/RMC time fields of a captured NMEA log:
+    #   python nmea_fields.py [nmea.txt]
+    import os, sys, timeit
+
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "nmea.txt")
+    with open(path, encoding='ascii', errors='ignore') as f:
+        lines = f.read().splitlines()
+    fields = [line.split(',')[1] for line in lines if line[3:6] in ('GGA', 'RMC') and line.count(',') > 1]
+
+    for field in fields:
+        new, old = parse_hhmmss(field), _parse_hhmmss_legacy(field)
+        if new != old and (new is None or old is None or abs(new - old) > 1e-6):
+            print(f"Mismatch: {field!r} -> {new} vs {old}")
+
+    rounds = 20000
+    t_old = min(timeit.repeat(lambda: [_parse_hhmmss_legacy(f) for f in fields], number=rounds, repeat=5))
+    t_new = min(timeit.repeat(lambda: [parse_hhmmss(f) for f in fields], number=rounds, repeat=5))
+    n = len(fields) * rounds
+    print(f"{len(fields)} time fields from {os.path.basename(path)}, {rounds} rounds")
+    print(f"strptime:     {t_old / n * 1e9:8.1f} ns/field")
+    print(f"parse_hhmmss: {t_new / n * 1e9:8.1f} ns/field")
+    print(f"speed-up:     {t_old / t_new:8.1f}x")
@@ -0,0 +1,168 @@
+import operator
+from functools import reduce
+
+import numpy as np
+
+from nmea_sentences import GSV
+
+# Field rewriting for retransmitted NMEA.
+#
+# nmea_adjustment used to split every GSV line, call adjust_snr (one
+# random.randint per field), join the fields again, recompute the whole
+# checksum character by character and grow data_adjust with +=. The
+# NmeaRewriter works on the received bytes. A line no rewrite applies to is
+# copied as is. For the others only the changed fields are touched: the
+# checksum is the XOR of the body, so it is updated by XORing out the old
+# field and XORing in the new one. Each rewrite sees all of its fields of
+# a batch (an epoch) at once, which lets SnrJitter draw the whole epoch's
+# jitter in one numpy call, and the output is built with a single join.
+#
+# Rewrites are pluggable: a FieldRewrite names the sentence types it
+# applies to, selects field numbers (0 is the address, so n is the n-th
+# comma separated field) and maps old values to new ones, e.g.
+#
+#   NmeaRewriter([SnrJitter(), TalkerRemap({'GN': 'GP'}),
+#                 TruncatePrecision({'GGA': (2, 4), 'RMC': (3, 5)}, decimals=4)])
+
+
+def _xor(data):
+    return reduce(operator.xor, data, 0)
+
+
+def _split(line):
+    # (fields, checksum) of one '$...*hh' line, None if it is not one
+    star = line.rfind(b'*')
+    if star < 6 or line[:1] != b'$' or len(line) != star + 3:
+        return None
+    try:
+        checksum = int(line[star + 1:], 16)
+    except ValueError:
+        return None
+    return line[1:star].split(b','), checksum
+
+
+def _bytes(mapping):
+    return {(k.encode('ascii') if isinstance(k, str) else k): (v.encode('ascii') if isinstance(v, str) else v)
+            for k, v in mapping.items()}
+
+
+class FieldRewrite:
+    # Sentence types (b'GSV', ...) the rewrite applies to, None for all
+    kinds = None
+
+    def select(self, fields):
+        """Field numbers to rewrite in one sentence; fields[0] is the address."""
+        return ()
+
+    def apply(self, values):
+        """New values (bytes) for the old values of every selected field of a batch."""
+        return values
+
+
+class SnrJitter(FieldRewrite):
+    kinds = frozenset((b'GSV',))
+
+    def __init__(self, spread=1, seed=None):
+        """Add a uniform integer in [-spread, spread] to every GSV SNR, clipped to 0..99."""
+        self.spread = spread
+        self.rng = np.random.default_rng(seed)
+
+    def select(self, fields):
+        # Empty SNR (satellite not tracked) stays empty
+        return [i + 1 for i in GSV.snr_indices(fields[1:]) if fields[i + 1].isdigit()]
+
+    def apply(self, values):
+        snr = np.array(values).astype(np.int64)
+        snr = np.clip(snr + self.rng.integers(-self.spread, self.spread + 1, len(snr)), 0, 99)
+        return [b'%02d' % v for v in snr.tolist()]
+
+
+class TalkerRemap(FieldRewrite):
+    def __init__(self, mapping):
+        """Replace talker IDs, e.g. {'GN': 'GP'} for receivers that only accept GP."""
+        self.mapping = _bytes(mapping)
+
+    def select(self, fields):
+        return (0,) if fields[0][:-3] in self.mapping else ()
+
+    def apply(self, values):
+        return [self.mapping[v[:-3]] + v[-3:] for v in values]
+
+
+class TruncatePrecision(FieldRewrite):
+    def __init__(self, fields, decimals):
+        """Cut the listed fields ({'GGA': (2, 4), ...}) to `decimals` places; no rounding, no float round trip."""
+        self.fields = {(k.encode('ascii') if isinstance(k, str) else k): tuple(v) for k, v in fields.items()}
+        self.kinds = frozenset(self.fields)
+        self.decimals = decimals
+
+    def select(self, fields):
+        n = len(fields)
+        return [i for i in self.fields[fields[0][-3:]] if i < n]
+
+    def apply(self, values):
+        keep = self.decimals + 1 if self.decimals else 0
+        out = []
+        for v in values:
+            dot = v.find(b'.')
+            out.append(v[:dot + keep] if dot >= 0 and len(v) > dot + keep else v)
+        return out
+
+
+class NmeaRewriter:
+    def __init__(self, rewrites=()):
+        self.rewrites = list(rewrites)
+        self.lines = 0
+        self.changed = 0   # fields whose value changed
+
+    def add(self, rewrite):
+        self.rewrites.append(rewrite)
+
+    def rewrite_lines(self, lines):
+        """Rewritten lines (bytes, no line ending) for an iterable of str or bytes NMEA lines, one per non-blank line, in order."""
+        out = []
+        parsed = []                          # [out index, fields, checksum, changed]
+        hits = [[] for _ in self.rewrites]   # per rewrite: (parsed index, field number)
+        for line in lines:
+            if isinstance(line, str):
+                line = line.encode('ascii', 'replace')
+            line = line.strip()
+            if not line:
+                continue
+            out.append(line)
+            split = _split(line)
+            if split is None:
+                continue
+            fields, checksum = split
+            kind = fields[0][-3:]
+            p = len(parsed)
+            for r, rewrite in enumerate(self.rewrites):
+                if rewrite.kinds is None or kind in rewrite.kinds:
+                    hits[r].extend((p, i) for i in rewrite.select(fields))
+            if any(h and h[-1][0] == p for h in hits):
+                parsed.append([len(out) - 1, fields, checksum, False])
+        self.lines += len(out)
+
+        for rewrite, selected in zip(self.rewrites, hits):
+            if not selected:
+                continue
+            old = [parsed[p][1][i] for p, i in selected]
+            for (p, i), before, after in zip(selected, old, rewrite.apply(old)):
+                if after != before:
+                    entry = parsed[p]
+                    entry[1][i] = after
+                    entry[2] ^= _xor(before) ^ _xor(after)
+                    entry[3] = True
+                    self.changed += 1
+        for index, fields, checksum, changed in parsed:
+            if changed:
+                out[index] = b'$%s*%02X' % (b','.join(fields), checksum)
+        return out
+
+    def rewrite(self, lines):
+        """One CRLF terminated buffer of the rewritten lines, b'' if there are none."""
+        out = self.rewrite_lines(lines)
+        if not out:
+            return b''
+        out.append(b'')
+        return b'\r\n'.join(out)
@@ -0,0 +1,278 @@
+from nmea_fields import parse_hhmmss, parse_latlon
+
+# Typed NMEA 0183 sentences.
+#
+# The GUI used to find sentences by substring ("GGA" in line), split the
+# same line again in every parse_* helper, hand raw strings around and
+# never look at the checksum. decode_sentence() checks the *hh checksum,
+# splits the line once and picks the sentence class from a single table
+# lookup on the three letter type. The result carries both the raw fields
+# (for retransmission and logging) and the decoded values (for kinematics
+# and CEP), so no other path needs to split the line again.
+
+TALKERS = {
+    "GP": "GPS",
+    "GL": "GLONASS",
+    "GA": "Galileo",
+    "GB": "BeiDou",
+    "BD": "BeiDou",
+    "GQ": "QZSS",
+    "GI": "NavIC",
+    "GN": "GNSS",
+}
+
+
+def nmea_checksum(body):
+    """XOR of the characters between '$' and '*'."""
+    c = 0
+    for b in body.encode('ascii', 'replace'):
+        c ^= b
+    return c
+
+
+def _float(s):
+    return float(s) if s else None
+
+
+def _int(s):
+    return int(s) if s else None
+
+
+class Sentence:
+    __slots__ = ('talker', 'kind', 'fields', 'line')
+    min_fields = 0
+
+    def __init__(self, talker, kind, fields, line=None):
+        self.talker = talker
+        self.kind = kind
+        # Fields after the address, without the checksum
+        self.fields = fields
+        # The sentence as received, for retransmission without re-encoding
+        self.line = line
+        self._decode(fields)
+
+    def _decode(self, f):
+        pass
+
+    @property
+    def system(self):
+        """Constellation name of the talker ID, None if unknown."""
+        return TALKERS.get(self.talker)
+
+    def encode(self, fields=None):
+        """Sentence text with a fresh checksum, from self.fields or replacement fields."""
+        if fields is None and self.line is not None:
+            return self.line
+        body = ','.join([self.talker + self.kind] + list(self.fields if fields is None else fields))
+        return f"${body}*{nmea_checksum(body):02X}"
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.talker}{self.kind} {','.join(self.fields)}>"
+
+
+class GGA(Sentence):
+    __slots__ = ('time', 'lat', 'lon', 'quality', 'num_sats', 'hdop', 'alt', 'geoid_sep')
+    min_fields = 9
+
+    def _decode(self, f):
+        self.time = parse_hhmmss(f[0])
+        self.lat = parse_latlon(f[1], f[2])
+        self.lon = parse_latlon(f[3], f[4])
+        self.quality = _int(f[5])
+        self.num_sats = _int(f[6])
+        self.hdop = _float(f[7])
+        self.alt = _float(f[8])
+        self.geoid_sep = _float(f[10]) if len(f) > 10 else None
+
+
+class RMC(Sentence):
+    __slots__ = ('time', 'valid', 'lat', 'lon', 'speed_knots', 'course', 'date', 'mode')
+    min_fields = 9
+
+    def _decode(self, f):
+        self.time = parse_hhmmss(f[0])
+        self.valid = f[1] == 'A'
+        self.lat = parse_latlon(f[2], f[3])
+        self.lon = parse_latlon(f[4], f[5])
+        self.speed_knots = _float(f[6])
+        self.course = _float(f[7])
+        self.date = f[8]  # ddmmyy
+        self.mode = f[11] if len(f) > 11 else ''
+
+
+class VTG(Sentence):
+    __slots__ = ('course_true', 'course_mag', 'speed_knots', 'speed_kmh', 'mode')
+    min_fields = 7
+
+    def _decode(self, f):
+        self.course_true = _float(f[0])
+        self.course_mag = _float(f[2])
+        self.speed_knots = _float(f[4])
+        self.speed_kmh = _float(f[6])
+        self.mode = f[8] if len(f) > 8 else ''
+
+
+class GSA(Sentence):
+    __slots__ = ('op_mode', 'fix_type', 'prns', 'pdop', 'hdop', 'vdop', 'system_id')
+    min_fields = 17
+
+    def _decode(self, f):
+        self.op_mode = f[0]
+        self.fix_type = _int(f[1])
+        self.prns = [int(p) for p in f[2:14] if p]
+        self.pdop = _float(f[14])
+        self.hdop = _float(f[15])
+        self.vdop = _float(f[16])
+        self.system_id = _int(f[17]) if len(f) > 17 else None
+
+
+class GSV(Sentence):
+    # sats: (prn, elevation, azimuth, snr) per satellite, ints or None
+    __slots__ = ('num_msgs', 'msg_num', 'num_sats', 'sats', 'signal_id')
+    min_fields = 3
+
+    def _decode(self, f):
+        self.num_msgs = _int(f[0])
+        self.msg_num = _int(f[1])
+        self.num_sats = _int(f[2])
+        n = (len(f) - 3) // 4
+        self.sats = [(int(f[i]), _int(f[i + 1]), _int(f[i + 2]), _int(f[i + 3]))
+                     for i in range(3, 3 + 4 * n, 4) if f[i]]
+        self.signal_id = f[3 + 4 * n] if len(f) > 3 + 4 * n else None
+
+    @staticmethod
+    def snr_indices(fields):
+        """Positions of the SNR fields in a GSV field list."""
+        return range(6, 3 + 4 * ((len(fields) - 3) // 4), 4)
+
+
+class GST(Sentence):
+    __slots__ = ('time', 'rms', 'sd_major', 'sd_minor', 'orientation', 'sd_lat', 'sd_lon', 'sd_alt')
+    min_fields = 8
+
+    def _decode(self, f):
+        self.time = parse_hhmmss(f[0])
+        self.rms = _float(f[1])
+        self.sd_major = _float(f[2])
+        self.sd_minor = _float(f[3])
+        self.orientation = _float(f[4])
+        self.sd_lat = _float(f[5])
+        self.sd_lon = _float(f[6])
+        self.sd_alt = _float(f[7])
+
+
+class ZDA(Sentence):
+    __slots__ = ('time', 'day', 'month', 'year', 'tz_hours', 'tz_minutes')
+    min_fields = 4
+
+    def _decode(self, f):
+        self.time = parse_hhmmss(f[0])
+        self.day = _int(f[1])
+        self.month = _int(f[2])
+        self.year = _int(f[3])
+        self.tz_hours = _int(f[4]) if len(f) > 4 else None
+        self.tz_minutes = _int(f[5]) if len(f) > 5 else None
+
+
+SENTENCE_TYPES = {cls.__name__: cls for cls in (GGA, RMC, VTG, GSA, GSV, GST, ZDA)}
+
+
+def decode_sentence(line):
+    """Typed sentence for one NMEA line, None if the checksum is missing or wrong, the type unknown or a field malformed."""
+    line = line.strip()
+    star = line.rfind('*')
+    if star < 6 or line[0] != '$' or len(line) != star + 3:
+        return None
+    body = line[1:star]
+    try:
+        if int(line[star + 1:], 16) != nmea_checksum(body):
+            return None
+    except ValueError:
+        return None
+    parts = body.split(',')
+    address = parts[0]
+    cls = SENTENCE_TYPES.get(address[-3:])
+    if cls is None or len(parts) - 1 < cls.min_fields:
+        return None
+    try:
+        return cls(address[:-3], address[-3:], parts[1:], line)
+    except ValueError:
+        return None
+
+
+class SentenceReassembler:
+    # Terminal captures and some serial bridges wrap long sentences, e.g.
+    # "$GNRMC,...,A,V*" followed by "6D" on the next line. Sentences are
+    # framed by '$' ... '*hh' instead of by newlines: an unterminated
+    # sentence is carried over to the next line(s), up to max_carry
+    # characters, and kept only if the joined text passes its checksum.
+
+    def __init__(self, max_carry=256):
+        self.max_carry = max_carry
+        self._carry = ''
+        self.recovered = 0  # sentences rebuilt from several lines
+        self.dropped = 0    # fragments thrown away
+
+    def reset(self):
+        self._carry = ''
+
+    def pending(self):
+        """True while an unterminated sentence is carried over."""
+        return bool(self._carry)
+
+    def sentences(self, lines):
+        """Generator of complete sentences over an iterable of physical lines."""
+        for line in lines:
+            yield from self.feed(line)
+
+    def feed(self, line):
+        """Complete sentences found in one physical line, including any it finishes from earlier lines."""
+        out = []
+        text = line.strip()
+        if not text:
+            return out
+        if self._carry:
+            dollar = text.find('$')
+            head = text if dollar < 0 else text[:dollar]
+            if head:
+                joined = self._carry + head
+                self._carry = ''
+                self._scan(joined, out, True)
+            else:
+                # A new sentence starts before the carried one was finished
+                self._carry = ''
+                self.dropped += 1
+            text = text[len(head):]
+        self._scan(text, out, False)
+        return out
+
+    def _scan(self, text, out, joined):
+        while text:
+            if text[0] != '$':
+                dollar = text.find('$')
+                self.dropped += 1
+                if dollar < 0:
+                    return
+                text = text[dollar:]
+            star = text.find('*')
+            end = star + 3
+            if star < 0 or len(text) < end:
+                if len(text) <= self.max_carry:
+                    self._carry = text
+                else:
+                    self.dropped += 1
+                return
+            if joined:
+                try:
+                    ok = int(text[star + 1:end], 16) == nmea_checksum(text[1:star])
+                except ValueError:
+                    ok = False
+                if ok:
+                    self.recovered += 1
+                    out.append(text[:end])
+                else:
+                    self.dropped += 1
+                joined = False
+            else:
+                out.append(text[:end])
+            text = text[end:]
@@ -0,0 +1,174 @@
+from collections import deque
+
+# Blitted time-series panels for the kinematic and CEP / RMS figures.
+#
+# render_kinematic and render_cep_err used to set the axis labels, turn the
+# grid on and run relim() + autoscale_view() (a scan of every point) on
+# each frame, followed by a full canvas.draw(). A PlotPanel leaves the
+# labels and styling to the figure setup, keeps the window min/max of
+# every column in monotonic deques fed only with the samples appended
+# since the last frame, and changes the limits only when the data leaves
+# the current view or shrinks well inside it. Frames with unchanged limits
+# restore the cached background and blit the lines, so the cost of a frame
+# no longer depends on the window length.
+
+
+class _WindowExtrema:
+    # Sliding-window min and max of one column, keyed by sample time
+    def __init__(self):
+        self._min = deque()
+        self._max = deque()
+
+    def clear(self):
+        self._min.clear()
+        self._max.clear()
+
+    def push(self, t, v):
+        if v != v:
+            return
+        while self._min and self._min[-1][1] >= v:
+            self._min.pop()
+        self._min.append((t, v))
+        while self._max and self._max[-1][1] <= v:
+            self._max.pop()
+        self._max.append((t, v))
+
+    def expire(self, t0):
+        while self._min and self._min[0][0] < t0:
+            self._min.popleft()
+        while self._max and self._max[0][0] < t0:
+            self._max.popleft()
+
+    def bounds(self):
+        if not self._min:
+            return None
+        return self._min[0][1], self._max[0][1]
+
+
+def _span(lo, hi):
+    r = hi - lo
+    return r if r > 0 else max(abs(hi), 1.0) * 0.1
+
+
+class _Trace:
+    # One column of a series drawn into one line, with its own window extrema
+    def __init__(self, series, column, line):
+        self.series = series
+        self.column = column
+        self.line = line
+        self.extrema = _WindowExtrema()
+        self._generation = None
+        self._last_t = None
+
+    def track(self, times, col):
+        if self._generation != self.series.generation or (
+                self._last_t is not None and len(times) and times[-1] < self._last_t):
+            # Cleared, or time went backwards: rescan the window once
+            self.extrema.clear()
+            self._last_t = None
+            self._generation = self.series.generation
+        if not len(times):
+            return
+        start = 0
+        if self._last_t is not None:
+            start = len(times)
+            while start > 0 and times[start - 1] > self._last_t:
+                start -= 1
+        for t, v in zip(times[start:].tolist(), col[start:].tolist()):
+            self.extrema.push(t, v)
+        self.extrema.expire(times[0])
+        self._last_t = float(times[-1])
+
+    def update(self):
+        times, col = self.series.snapshot(self.column)
+        self.track(times, col)
+        self.line.set_data(times, col)
+        return times
+
+
+class PlotPanel:
+    def __init__(self, canvas, series, columns, lines, ypad=0.1, xpad=0.2, shrink=0.5):
+        """Draw series columns (names) into lines, one Line2D per axes, all on the same canvas.
+
+        ypad/xpad: head room added around the data when limits are refitted,
+        as a fraction of the data range. shrink: refit when the data would
+        fill less than this fraction of the current view.
+        """
+        self.canvas = canvas
+        self.series = series
+        self.columns = tuple(columns)
+        self.lines = list(lines)
+        self.axes = [line.axes for line in self.lines]
+        self.ypad = ypad
+        self.xpad = xpad
+        self.shrink = shrink
+        self._traces = [_Trace(series, column, line) for column, line in zip(self.columns, self.lines)]
+        self._background = None
+        for line in self.lines:
+            line.set_animated(True)
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def add_trace(self, series, column, line):
+        """Overlay another series column on one of the panel's axes (line.axes).
+
+        The x range follows the panel's own series; the y range covers both.
+        """
+        if line.axes not in self.axes:
+            raise ValueError("Overlay line must be drawn on one of the panel's axes")
+        line.set_animated(True)
+        self._traces.append(_Trace(series, column, line))
+
+    def _on_draw(self, event):
+        # Full redraws (limit change, resize, tab switch) refresh the background
+        self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        for trace in self._traces:
+            trace.line.axes.draw_artist(trace.line)
+
+    def _bounds(self, ax):
+        # y extent of every trace on the axes
+        bounds = [t.extrema.bounds() for t in self._traces if t.line.axes is ax]
+        bounds = [b for b in bounds if b is not None]
+        if not bounds:
+            return None
+        return min(b[0] for b in bounds), max(b[1] for b in bounds)
+
+    def _refit(self, lo, hi, view, pad, low_pad=None):
+        # New (lo, hi) limits if the data escapes the view or shrank well inside it, else None
+        r = _span(lo, hi)
+        low_pad = pad if low_pad is None else low_pad
+        v0, v1 = view
+        if lo >= v0 and hi <= v1 and r * (1 + low_pad + pad) >= self.shrink * (v1 - v0):
+            return None
+        return lo - low_pad * r, hi + pad * r
+
+    def update(self):
+        """Push the newest samples to the lines. Always draws; returns True for the render scheduler."""
+        times = [trace.update() for trace in self._traces][0]
+
+        full = self._background is None
+        if len(times):
+            # Time only grows, so all the head room goes to the right
+            xlim = self._refit(float(times[0]), float(times[-1]), self.axes[0].get_xlim(), self.xpad, 0.0)
+            if xlim is not None:
+                for ax in self.axes:
+                    ax.set_xlim(*xlim)
+                full = True
+            for ax in self.axes:
+                bounds = self._bounds(ax)
+                if bounds is None:
+                    continue
+                ylim = self._refit(bounds[0], bounds[1], ax.get_ylim(), self.ypad)
+                if ylim is not None:
+                    ax.set_ylim(*ylim)
+                    full = True
+
+        if full:
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_lines()
+            self.canvas.blit(self.canvas.figure.bbox)
+        return True
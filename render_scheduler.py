@@ -0,0 +1,69 @@
+import threading
+
+# Frame-paced Matplotlib drawing on the Tk thread.
+#
+# Data producers (including the socket reader threads) only call
+# mark_dirty(name). A Tk `after` loop running at max_fps collects the dirty
+# names, runs each figure's optional prepare callback (set_data, limits,
+# ...) and draws each dirty canvas once. However fast sentences arrive,
+# every figure is drawn at most once per frame and never off the Tk thread.
+
+
+class RenderScheduler:
+    def __init__(self, root, max_fps=10):
+        self.root = root
+        self._targets = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._after_id = None
+        self.set_max_fps(max_fps)
+
+    def set_max_fps(self, max_fps):
+        self.max_fps = max_fps
+        self.interval_ms = max(1, int(1000 / max_fps))
+
+    def register(self, name, canvas, prepare=None):
+        """prepare() runs on the Tk thread right before canvas is drawn.
+
+        If prepare() returns True it has already updated the canvas itself
+        (e.g. by blitting) and the full draw is skipped.
+        """
+        self._targets[name] = (canvas, prepare)
+
+    def mark_dirty(self, *names):
+        """Request a redraw; safe to call from any thread."""
+        with self._lock:
+            self._dirty.update(names)
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def flush(self):
+        """Draw everything that is dirty now (Tk thread only)."""
+        with self._lock:
+            dirty = self._dirty
+            self._dirty = set()
+        for name in dirty:
+            if name not in self._targets:
+                # Figure not built yet (its tab was never shown)
+                continue
+            canvas, prepare = self._targets[name]
+            try:
+                if prepare and prepare():
+                    continue
+                canvas.draw()
+            except Exception as e:
+                print(f"[Render Error] {name}: {e}")
+
+    def _tick(self):
+        self.flush()
+        self._after_id = self.root.after(self.interval_ms, self._tick)
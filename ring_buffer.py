@@ -0,0 +1,80 @@
+import numpy as np
+
+# Fixed-capacity time series for the live plots.
+#
+# The plot dicts used to append to Python lists and, past 500 points,
+# slice every key and rebuild the time list on each new sample. RingSeries
+# preallocates its columns and writes every sample twice, at i and at
+# i + capacity, so the newest `capacity` samples are always one contiguous
+# slice: append is O(1) and the ordered view handed to Line2D.set_data is
+# a slice, not a copy.
+
+
+class RingSeries:
+    def __init__(self, names, capacity=500):
+        self.names = tuple(names)
+        self._index = {name: i + 1 for i, name in enumerate(self.names)}
+        self.capacity = capacity
+        self._buf = np.zeros((len(self.names) + 1, 2 * capacity))
+        # Bumped by clear() so readers caching derived state can tell
+        self.generation = 0
+        self.clear()
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+        self.generation += 1
+        # Times are stored relative to the first sample after a clear
+        self.origin = None
+
+    def __len__(self):
+        return self._count
+
+    def set_capacity(self, capacity):
+        """Resize the window, keeping the newest samples."""
+        keep = min(self._count, capacity)
+        old = self._buf[:, self._start():self._start() + self._count][:, self._count - keep:]
+        self.capacity = capacity
+        self._buf = np.zeros((len(self.names) + 1, 2 * capacity))
+        self._buf[:, :keep] = old
+        self._buf[:, capacity:capacity + keep] = old
+        self._count = keep
+        self._head = keep % capacity
+
+    def append(self, t, *values):
+        if self.origin is None:
+            self.origin = t
+        i = self._head
+        j = i + self.capacity
+        col = self._buf
+        col[0, i] = col[0, j] = t - self.origin
+        for k, v in enumerate(values, 1):
+            col[k, i] = col[k, j] = v
+        self._head = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def _start(self):
+        if self._count < self.capacity:
+            return 0
+        return self._head
+
+    def times(self):
+        """Ordered view of the sample times (seconds since the first sample)."""
+        s = self._start()
+        return self._buf[0, s:s + self._count]
+
+    def __getitem__(self, name):
+        s = self._start()
+        return self._buf[self._index[name], s:s + self._count]
+
+    def snapshot(self, *names):
+        """Ordered (times, *columns) views of equal length, even if another thread is appending."""
+        n = self._count
+        s = self._head if n == self.capacity else 0
+        return tuple(self._buf[k, s:s + n] for k in [0] + [self._index[name] for name in names])
+
+    def last(self, name):
+        if not self._count:
+            return None
+        return float(self._buf[self._index[name], (self._head - 1) % self.capacity])
@@ -0,0 +1,70 @@
+from track_lines import format_channel_row
+
+# Diff-based satellite table.
+#
+# update_table used to read every row back from the Treeview
+# (tree.item(iid) is a Tcl round-trip) and then rewrite every row's values
+# and tags on each refresh. SatTable remembers the iid and the last
+# rendered cells of each (CH, SAT, SIG) row on the Python side and only
+# calls into Tk for rows that were added, removed or whose cells or stripe
+# tag actually changed. A changed row order is applied with one
+# set_children call instead of moving rows one by one.
+
+
+class SatTable:
+    def __init__(self, tree, tags=("evenrow", "oddrow")):
+        self.tree = tree
+        self.tags = tags
+        self._rows = {}    # (CH, SAT, SIG) -> [iid, values, tag]
+        self._order = []   # iids in displayed order
+
+    def __len__(self):
+        return len(self._rows)
+
+    def update(self, rows):
+        """Show ChannelRows in the given order. Returns the number of Tk item calls made."""
+        tree = self.tree
+        stale = dict(self._rows)
+        order = []
+        added = []
+        calls = 0
+        for i, row in enumerate(rows):
+            key = (row.ch, row.sat, row.sig)
+            values = format_channel_row(row)
+            tag = self.tags[i % len(self.tags)]
+            entry = stale.pop(key, None)
+            if entry is None:
+                iid = tree.insert("", "end", values=values, tags=(tag,))
+                self._rows[key] = [iid, values, tag]
+                added.append(iid)
+                calls += 1
+            else:
+                iid = entry[0]
+                if entry[1] != values or entry[2] != tag:
+                    tree.item(iid, values=values, tags=(tag,))
+                    entry[1] = values
+                    entry[2] = tag
+                    calls += 1
+            order.append(iid)
+
+        if stale:
+            removed = {entry[0] for entry in stale.values()}
+            tree.delete(*removed)
+            for key in stale:
+                del self._rows[key]
+            calls += 1
+        else:
+            removed = ()
+        # Inserted rows went to the end; if that is not the wanted order,
+        # one call puts every row in place
+        shown = [iid for iid in self._order if iid not in removed] + added
+        if shown != order:
+            tree.set_children("", *order)
+            calls += 1
+        self._order = order
+        return calls
+
+    def clear(self):
+        self.tree.delete(*self.tree.get_children())
+        self._rows.clear()
+        self._order = []
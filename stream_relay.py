@@ -0,0 +1,166 @@
+import asyncio
+import sys
+import threading
+from collections import deque
+
+# Rebroadcast of the ingested NMEA and tracking streams.
+#
+# sim_data.py and pocket_trk accept a single client (listen(1)), so the GUI
+# and any other tool fought over the one socket; a second connection was
+# refused or starved the first. Now the GUI (or gnss_daemon) stays the only
+# client of the receiver and a StreamRelay serves what it reads to any
+# number of clients. The relay is an asyncio server on its own thread;
+# feed_lines() hands each received burst over with one
+# call_soon_threadsafe, so the reader never blocks on a client.
+#
+# Every client has its own queue of bursts and its own writer task. While
+# a client's socket is full the task waits in drain() and the bursts that
+# arrive meanwhile are written together in one write (coalescing). If the
+# queue grows past max_buffer bytes the oldest bursts are dropped, whole
+# lines only, so a stalled client loses data but never delays the others.
+
+
+class _Client:
+    def __init__(self, writer, max_buffer):
+        self.writer = writer
+        self.peer = writer.get_extra_info('peername')
+        self.max_buffer = max_buffer
+        self.chunks = deque()
+        self.size = 0
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.sent = 0
+        self.writes = 0
+        self.dropped = 0
+
+    def push(self, data):
+        self.chunks.append(data)
+        self.size += len(data)
+        while self.size > self.max_buffer and len(self.chunks) > 1:
+            self.size -= len(self.chunks.popleft())
+            self.dropped += 1
+        self.ready.set()
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        self.size = 0
+        self.ready.clear()
+        return data
+
+
+class StreamRelay:
+    def __init__(self, port, host='127.0.0.1', name='Relay', newline='\r\n',
+                 max_buffer=256 * 1024, high_water=64 * 1024):
+        """Serve fed lines on host:port. max_buffer: bytes queued per client before the oldest are dropped;
+        high_water: socket buffer level at which a client's writer waits."""
+        self.port = port
+        self.host = host
+        self.name = name
+        self.newline = newline
+        self.max_buffer = max_buffer
+        self.high_water = high_water
+        self.error = None
+        self.fed = 0
+        self._clients = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    @property
+    def clients(self):
+        return len(self._clients)
+
+    def start(self):
+        """Listen on host:port; returns False (and prints why) if the port cannot be opened."""
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name=self.name, daemon=True)
+        self._thread.start()
+        ready.wait(5.0)
+        if self._loop is None:
+            print(f"[{self.name}] cannot listen on {self.host}:{self.port}: {self.error}", file=sys.stderr)
+            return False
+        print(f"[{self.name}] serving on {self.host}:{self.port}", file=sys.stderr)
+        return True
+
+    def _run(self, ready):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._server = loop.run_until_complete(asyncio.start_server(self._serve, self.host, self.port))
+        except OSError as e:
+            self.error = e
+            loop.close()
+            ready.set()
+            return
+        self._loop = loop
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+
+    def stop(self):
+        loop = self._loop
+        if loop is not None:
+            self._loop = None
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join(timeout=2)
+
+    def feed(self, data):
+        """Queue bytes for every connected client; safe from any thread."""
+        loop = self._loop
+        if loop is not None and self._clients:
+            self.fed += len(data)
+            loop.call_soon_threadsafe(self._push, data)
+
+    def feed_lines(self, lines):
+        """Queue one burst of lines (without terminators) as a single chunk."""
+        if lines and self._clients:
+            self.feed((self.newline.join(lines) + self.newline).encode('utf-8', 'replace'))
+
+    def _push(self, data):
+        for client in self._clients:
+            client.push(data)
+
+    async def _watch(self, reader, client):
+        # Anything a client sends is discarded; EOF ends its writer even while no data is flowing
+        try:
+            while await reader.read(4096):
+                pass
+        except (ConnectionError, OSError):
+            pass
+        client.closed = True
+        client.ready.set()
+
+    async def _serve(self, reader, writer):
+        client = _Client(writer, self.max_buffer)
+        writer.transport.set_write_buffer_limits(high=self.high_water)
+        self._clients.add(client)
+        watch = asyncio.ensure_future(self._watch(reader, client))
+        print(f"[{self.name}] client {client.peer[0]}:{client.peer[1]} connected ({self.clients} total)", file=sys.stderr)
+        try:
+            while True:
+                await client.ready.wait()
+                if client.closed:
+                    break
+                # Everything queued since the last write goes out in one write
+                data = client.take()
+                writer.write(data)
+                await writer.drain()
+                client.sent += len(data)
+                client.writes += 1
+        except (ConnectionError, OSError, asyncio.CancelledError):
+            # CancelledError: the relay is stopping
+            pass
+        finally:
+            watch.cancel()
+            self._clients.discard(client)
+            writer.close()
+            print(f"[{self.name}] client {client.peer[0]}:{client.peer[1]} disconnected: {client.sent} B in "
+                  f"{client.writes} writes, {client.dropped} bursts dropped", file=sys.stderr)
@@ -0,0 +1,79 @@
+import time
+from collections import deque, namedtuple
+
+from track_lines import classify_line, parse_channel_line, LINE_POSITION, LINE_CHANNEL
+
+# Epoch batching for the pocket_trk tracking display.
+#
+# pocket_trk redraws one position/status line followed by one line per
+# tracked channel. Instead of queueing every line for the Tk loop, the
+# reader threads group them here and hand over one TrackEpoch per redraw.
+# A redraw ends at the next status line, or once the stream has been
+# quiet for a few times the spacing seen between the lines of recent
+# redraws (at least min_gap, at most `timeout` seconds): pocket_trk prints
+# a redraw in one go, so the table is handed over right after its last
+# row instead of one redraw late. The reader calls poll() while its
+# socket or pipe is quiet; how the lines were split into TCP segments
+# does not matter.
+
+# status:   cleaned position/status line, or None if the epoch started mid-redraw
+# channels: tuple of ChannelRow decoded from the channel table
+# received: time.monotonic() when the epoch's first line (normally the status line) arrived
+TrackEpoch = namedtuple('TrackEpoch', ['status', 'channels', 'received'])
+
+
+class TrackEpochAssembler:
+    def __init__(self, emit, timeout=1.5, min_gap=0.05, spacing_factor=3.0):
+        self.emit = emit
+        self.timeout = timeout
+        self.min_gap = min_gap
+        self.spacing_factor = spacing_factor
+        self._status = None
+        self._channels = []
+        self._last = None
+        self._received = None
+        self._spacing = 0.0              # widest line spacing in the open redraw
+        self._spacings = deque(maxlen=8)  # the same for recent redraws
+
+    def silence(self):
+        """Seconds without data that end the open redraw."""
+        if not self._spacings:
+            return self.timeout
+        return min(self.timeout, max(self.min_gap, self.spacing_factor * max(self._spacings)))
+
+    def feed(self, line):
+        now = time.monotonic()
+        kind, cleaned = classify_line(line)
+        if kind == LINE_CHANNEL:
+            row = parse_channel_line(cleaned)
+            if row:
+                if self._status is not None or self._channels:
+                    if now - self._last > self.silence():
+                        self.flush()
+                    else:
+                        self._spacing = max(self._spacing, now - self._last)
+                if self._status is None and not self._channels:
+                    self._received = now
+                self._channels.append(row)
+        elif kind == LINE_POSITION:
+            # A new status line closes the previous redraw
+            self.flush()
+            self._status = cleaned
+            self._received = now
+        self._last = now
+
+    def poll(self):
+        """Called by the reader while no data arrives; closes the redraw after silence() s."""
+        if (self._status is not None or self._channels) and time.monotonic() - self._last > self.silence():
+            self.flush()
+
+    def flush(self):
+        if self._status is None and not self._channels:
+            return
+        epoch = TrackEpoch(self._status, tuple(self._channels), self._received)
+        if self._status is not None and len(self._channels) > 1:
+            self._spacings.append(self._spacing)
+        self._status = None
+        self._channels = []
+        self._spacing = 0.0
+        self.emit(epoch)
@@ -0,0 +1,136 @@
+import re
+from collections import namedtuple
+
+# Classification of pocket_trk console lines.
+#
+# Every tracking line used to go through re.sub for the ANSI escapes and
+# two re.match calls. Most lines carry no escape sequence at all, channel
+# rows are printed with fixed column widths ("%4d %2d  %s ...") and the
+# position/status lines have a fixed "YYYY-MM-DD" prefix, so the common
+# cases are decided from the first character of the raw line and a few
+# fixed-column checks, before the line is stripped. The precompiled
+# channel regex is only a fallback for odd widths.
+
+LINE_NOISE = 0
+LINE_POSITION = 1
+LINE_CHANNEL = 2
+LINE_HEADER = 3
+
+ANSI_RE = re.compile(r'\033\[[0-9;]*[mA]')
+CHANNEL_RE = re.compile(r"\d+\s+\d+\s+[A-Z]\d+")
+
+_DIGITS = frozenset("0123456789")
+_UPPER = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+
+def strip_ansi(line):
+    if '\033' in line:
+        line = ANSI_RE.sub('', line)
+    return line.strip()
+
+
+def classify_line(line):
+    """Return (kind, cleaned_line) for one raw, unstripped console line."""
+    if '\033' in line:
+        line = ANSI_RE.sub('', line)
+    # The first character of the raw line picks the one fixed-column check
+    # that can apply, before the line is stripped or copied
+    first = line[:1]
+    if first == ' ':
+        # CH right-aligned in 4 columns, SAT starting at column 9 ("   4  1  G04")
+        if len(line) > 10 and line[9] in _UPPER and line[10] in _DIGITS and line[3] in _DIGITS:
+            return LINE_CHANNEL, line.strip()
+    elif first in _DIGITS:
+        # "YYYY-MM-DD hh:mm:ss.s ..." starts in column 0, so only the right end needs stripping
+        if len(line) > 13 and line[4] == '-' and line[7] == '-' and line[10] == ' ' and line[13] == ':':
+            return LINE_POSITION, line.rstrip()
+    cleaned = line.strip()
+    if not cleaned:
+        return LINE_NOISE, cleaned
+    if cleaned[0] in _DIGITS:
+        if (cleaned[4:5] == '-' and cleaned[7:8] == '-' and cleaned[:10].replace('-', '').isdigit()):
+            return LINE_POSITION, cleaned
+        if CHANNEL_RE.match(cleaned):
+            return LINE_CHANNEL, cleaned
+        return LINE_NOISE, cleaned
+    if cleaned.startswith("CH ") and " SAT " in cleaned:
+        return LINE_HEADER, cleaned
+    return LINE_NOISE, cleaned
+
+
+# Channel table row with typed fields, in the column order of the satellite table
+ChannelRow = namedtuple('ChannelRow', ['ch', 'sat', 'sig', 'prn', 'lock', 'cn0', 'coff', 'dop', 'nav', 'lol', 'fec'])
+
+
+def parse_channel_line(line):
+    """Decode one channel table line into a ChannelRow, or None if it is malformed.
+
+    Columns: CH RF SAT SIG PRN LOCK(s) C/N0 [bar] COFF(ms) DOP(Hz) ADR(cyc) SYNC NAV ERR LOL FEC.
+    The C/N0 bar is empty for weak signals, so the tail is indexed from the right.
+    """
+    parts = line.split()
+    if len(parts) < 15:
+        print(f"[Skip] Incomplete line ({len(parts)} parts): {line.strip()}")
+        return None
+    try:
+        return ChannelRow(
+            int(parts[0]),       # CH
+            parts[2],            # SAT
+            parts[3],            # SIG
+            int(parts[4]),       # PRN
+            float(parts[5]),     # LOCK(s)
+            float(parts[6]),     # C/N0 (dB-Hz)
+            float(parts[-8]),    # COFF(ms)
+            float(parts[-7]),    # DOP(Hz)
+            int(parts[-4]),      # NAV
+            int(parts[-2]),      # LOL
+            int(parts[-1]),      # FEC
+        )
+    except ValueError as e:
+        print(f"[Error] {e} in line: {line.strip()}")
+        return None
+
+
+def format_channel_row(row):
+    """Table cell strings for a ChannelRow, using pocket_trk's own precision."""
+    return (row.ch, row.sat, row.sig, row.prn, f"{row.lock:.2f}", f"{row.cn0:.1f}",
+            f"{row.coff:.7f}", f"{row.dop:.1f}", row.nav, row.lol, row.fec)
+
+
+def _classify_line_legacy(line):
+    # Previous process_queue logic, kept for the benchmark below
+    cleaned = re.sub(r'\033\[[0-9;]*[mA]', '', line).strip()
+    if not cleaned or "CH  RF  SAT  SIG" in cleaned:
+        return LINE_NOISE, cleaned
+    if re.match(r"\d{4}-\d{2}-\d{2}", cleaned):
+        return LINE_POSITION, cleaned
+    if re.match(r"\s*\d+\s+\d+\s+[A-Z]\d+", cleaned):
+        return LINE_CHANNEL, cleaned
+    return LINE_NOISE, cleaned
+
+
+if __name__ == "__main__":
+    # Microbenchmark against a captured pocket_trk session:
+    #   python track_lines.py [capture.txt]
+    import os, sys, timeit
+
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "err.txt")
+    with open(path, encoding='utf-8', errors='ignore') as f:
+        lines = f.read().splitlines()
+
+    for line in lines:
+        new, old = classify_line(line), _classify_line_legacy(line)
+        if new != old and new[0] != LINE_HEADER:
+            print(f"Mismatch: {line!r} -> {new[0]} vs {old[0]}")
+
+    rounds = 2000
+    # Old and new alternate, so a busy machine slows both alike; the best round of each counts
+    t_old = t_new = float('inf')
+    for _ in range(9):
+        t_old = min(t_old, timeit.timeit(lambda: [_classify_line_legacy(l) for l in lines], number=rounds))
+        t_new = min(t_new, timeit.timeit(lambda: [classify_line(l) for l in lines], number=rounds))
+    n = len(lines) * rounds
+    print(f"{len(lines)} lines from {os.path.basename(path)}, {rounds} rounds")
+    print(f"legacy:   {t_old / n * 1e9:8.1f} ns/line")
+    print(f"classify: {t_new / n * 1e9:8.1f} ns/line")
+    print(f"speed-up: {t_old / t_new:8.1f}x")
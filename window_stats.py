@@ -0,0 +1,118 @@
+import math
+from collections import deque
+
+# Sliding-window speed statistics.
+#
+# calculate_vrms used to pop(0) from a list and run
+# sqrt(mean(square(list))) over the whole window every epoch. Here the
+# window keeps running sums of v and v^2 (O(1) per update) and a monotonic
+# deque for the maximum. The sums are recomputed exactly once per window
+# length of evictions so floating point drift cannot build up over long runs.
+# WindowedMax is the monotonic deque on its own, for series where only the
+# maximum is wanted (the kinematics max jerk).
+
+
+class WindowedSpeedStats:
+    def __init__(self, window=1000, window_s=None):
+        """window: max number of samples; window_s: optional max age in seconds."""
+        self.window = window
+        self.window_s = window_s
+        self._samples = deque()
+        self._maxq = deque()
+        self.reset()
+
+    def reset(self):
+        self._samples.clear()
+        self._maxq.clear()
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._evicted = 0
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._samples)
+
+    def add(self, v, t=None):
+        """Add one speed sample (m/s) taken at time t (s) and return the windowed RMS."""
+        v = float(v)
+        seq = self._seq
+        self._seq += 1
+        self._samples.append((seq, t, v))
+        self._sum += v
+        self._sumsq += v * v
+        while self._maxq and self._maxq[-1][1] <= v:
+            self._maxq.pop()
+        self._maxq.append((seq, v))
+
+        while len(self._samples) > self.window:
+            self._evict()
+        if self.window_s is not None and t is not None:
+            while len(self._samples) > 1 and t - self._samples[0][1] > self.window_s:
+                self._evict()
+
+        if self._evicted >= self.window:
+            self._renormalise()
+        return self.rms
+
+    def _evict(self):
+        seq, _, v = self._samples.popleft()
+        self._sum -= v
+        self._sumsq -= v * v
+        self._evicted += 1
+        if self._maxq and self._maxq[0][0] == seq:
+            self._maxq.popleft()
+
+    def _renormalise(self):
+        values = [s[2] for s in self._samples]
+        self._sum = math.fsum(values)
+        self._sumsq = math.fsum(v * v for v in values)
+        self._evicted = 0
+
+    @property
+    def rms(self):
+        n = len(self._samples)
+        return math.sqrt(max(self._sumsq, 0.0) / n) if n else 0
+
+    @property
+    def mean(self):
+        n = len(self._samples)
+        return self._sum / n if n else 0
+
+    @property
+    def std(self):
+        n = len(self._samples)
+        if not n:
+            return 0
+        m = self._sum / n
+        return math.sqrt(max(self._sumsq / n - m * m, 0.0))
+
+    @property
+    def max(self):
+        return self._maxq[0][1] if self._maxq else 0
+
+
+class WindowedMax:
+    def __init__(self, window=500):
+        """Maximum of the last `window` values."""
+        self.window = window
+        self._maxq = deque()   # (seq, value), values decreasing
+        self.reset()
+
+    def reset(self):
+        self._maxq.clear()
+        self._seq = 0
+
+    def add(self, v):
+        v = float(v)
+        seq = self._seq
+        self._seq += 1
+        while self._maxq and self._maxq[-1][1] <= v:
+            self._maxq.pop()
+        self._maxq.append((seq, v))
+        if self._maxq[0][0] <= seq - self.window:
+            self._maxq.popleft()
+        return self._maxq[0][1]
+
+    @property
+    def max(self):
+        return self._maxq[0][1] if self._maxq else 0